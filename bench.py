@@ -0,0 +1,480 @@
+"""
+Benchmarks for the per-frame hot path: gesture logic + ball physics driven
+by landmark sequences, plus keypoint extraction and message encoding on
+their own.
+
+Sequences are a synthetic session (sweep-pickup, dribble, cross,
+between-legs, behind-back, real and fake shots, dropped poses) and any
+recordings made with config.RECORD_PATH. For each one we report frames
+per second, per-frame latency (p50 / p95 / p99 / max), peak transient
+memory per frame (tracemalloc: the highest traced size above the frame's
+starting size, median over frames), how often each action starts and
+each move fires, and the per-tick cost of the batched multi-player engine
+as N grows, and check that the batched engine plays the same game as
+GameLogic (any mismatch fails the run).
+
+Behaviour and speed are compared against two files:
+
+    bench_behaviour.json   action and move counts per sequence; committed, so
+                           a config.py threshold change that alters the game
+                           fails the run on any checkout until it is re-saved
+    bench_baseline.json    timings; they only compare on one machine, so it is
+                           gitignored: run `python bench.py --save` once on a
+                           fresh checkout, before making changes
+
+    python bench.py                       # run and compare with both
+    python bench.py --save                # run and make this the new baseline (both files)
+    python bench.py --recording s.bbrc    # also replay a recorded session
+
+Commit bench_behaviour.json with the change when a new count is intended;
+save it from a run without --recording, since recordings stay local.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from collections import Counter
+
+import numpy as np
+
+from game import GameLogic
+from game_batch import BatchGame
+from game_state import GameState
+from gestures import GestureDetector, LABELS
+from physics import BallPhysics
+from pose_stream import (
+    LazyKeypoints, extract_keypoints, NUM_LANDMARKS, NOSE,
+    LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_ELBOW, RIGHT_ELBOW, LEFT_WRIST, RIGHT_WRIST, X, Y, Z,
+)
+from protocol import encode_binary, encode_json
+from recorder import read_recording
+from utils import dist
+
+BASELINE_PATH = "bench_baseline.json"
+BEHAVIOUR_PATH = "bench_behaviour.json"
+FPS_TOLERANCE = 0.15      # flag a sequence whose fps drops more than this
+LATENCY_TOLERANCE = 0.25  # ... or whose p95 frame time grows more than this
+
+WIDTH, HEIGHT, FPS = 640, 480, 30
+
+
+# ---------- Synthetic session ----------
+# Keyframes are (seconds, left_wrist(x, y), right_wrist(x, y)), normalized
+# image coordinates, linearly interpolated at FPS. Every move starts by
+# sweeping both hands along the floor to pick the ball up wherever it is.
+PICKUP = [
+    (0.0, (0.08, 0.86), (0.12, 0.86)),
+    (1.2, (0.88, 0.86), (0.92, 0.86)),
+    (1.7, (0.47, 0.45), (0.53, 0.45)),
+]
+LEFT_AWAY = (0.30, 0.62)  # left hand snaps off the ball (one frame) so the right one holds it alone
+MOVES = {
+    "dribble": [
+        (1.8, (0.47, 0.45), (0.53, 0.45)),
+        (1.84, LEFT_AWAY, (0.53, 0.45)),
+        (2.3, LEFT_AWAY, (0.53, 0.45)),
+        (2.4, LEFT_AWAY, (0.53, 0.75)),
+        (2.9, LEFT_AWAY, (0.53, 0.50)),
+    ],
+    "cross": [
+        (1.8, (0.47, 0.45), (0.53, 0.45)),
+        (1.84, LEFT_AWAY, (0.53, 0.45)),
+        (2.3, LEFT_AWAY, (0.53, 0.45)),
+        (2.6, LEFT_AWAY, (0.30, 0.45)),
+    ],
+    "between_legs": [
+        (1.8, (0.47, 0.45), (0.53, 0.45)),
+        (1.84, LEFT_AWAY, (0.53, 0.45)),
+        (2.6, LEFT_AWAY, (0.53, 0.70)),
+        (2.9, LEFT_AWAY, (0.53, 0.70)),
+        (3.2, LEFT_AWAY, (0.30, 0.70)),
+    ],
+    "behind_back": [
+        (1.8, (0.47, 0.45), (0.53, 0.45)),
+        (1.84, LEFT_AWAY, (0.53, 0.45)),
+        (2.3, LEFT_AWAY, (0.53, 0.45)),
+        (2.6, LEFT_AWAY, (0.30, 0.45)),
+    ],
+    # shots: one fast frame up while both hands carry the ball; only the real one ends above the nose
+    "real_shot": [
+        (2.0, (0.47, 0.45), (0.53, 0.45)),
+        (2.5, (0.47, 0.25), (0.53, 0.25)),
+        (2.54, (0.47, 0.10), (0.53, 0.10)),
+        (3.0, (0.47, 0.10), (0.53, 0.10)),
+    ],
+    "fake_shot": [
+        (2.0, (0.47, 0.45), (0.53, 0.45)),
+        (2.04, (0.47, 0.30), (0.53, 0.30)),
+        (2.6, (0.47, 0.30), (0.53, 0.30)),
+    ],
+}
+REST = ((0.30, 0.65), (0.70, 0.65))
+
+
+def _body():
+    """A standing pose with the arms down; wrists are filled in per frame."""
+    lm = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+    lm[:, X], lm[:, Y], lm[:, 3] = 0.5, 0.6, 0.9
+    lm[NOSE, :2] = 0.5, 0.20
+    lm[LEFT_SHOULDER, :2], lm[RIGHT_SHOULDER, :2] = (0.42, 0.35), (0.58, 0.35)
+    lm[LEFT_ELBOW, :2], lm[RIGHT_ELBOW, :2] = (0.38, 0.50), (0.62, 0.50)
+    return lm
+
+
+def _interpolate(keys, t):
+    """Wrist positions, shape (len(t), 2, 2), at times t along the keyframes."""
+    times = np.array([k[0] for k in keys])
+    points = np.array([[k[1], k[2]] for k in keys], dtype=np.float64).reshape(len(keys), 4)
+    out = np.stack([np.interp(t, times, points[:, i]) for i in range(4)], axis=1)
+    return out.reshape(-1, 2, 2)
+
+
+def _script(cycles):
+    """(move name, keyframes, frame times) of every chunk of the synthetic session."""
+    for _ in range(cycles):
+        for name, move in MOVES.items():
+            keys = PICKUP + move + [(move[-1][0] + 0.4, *REST), (move[-1][0] + 1.2, *REST)]
+            yield name, keys, np.arange(0.0, keys[-1][0], 1.0 / FPS)
+
+
+def synthetic_session(cycles=4, seed=0):
+    """
+    (ts, landmarks) arrays for a scripted session: every move in MOVES,
+    `cycles` times, with pose jitter and ~1% frames where the pose is lost.
+    landmarks has shape (frames, 33, 4); lost frames are all-NaN.
+    """
+    rng = np.random.default_rng(seed)
+    body = _body()
+    chunks, behind = [], []
+    for name, keys, t in _script(cycles):
+        chunks.append(_interpolate(keys, t))
+        behind.append(np.full(len(t), name == "behind_back"))
+    wrists = np.concatenate(chunks)
+    behind = np.concatenate(behind)
+
+    n = len(wrists)
+    lm = np.broadcast_to(body, (n, NUM_LANDMARKS, 4)).copy()
+    lm[:, LEFT_WRIST, :2] = wrists[:, 0]
+    lm[:, RIGHT_WRIST, :2] = wrists[:, 1]
+    lm[behind, RIGHT_WRIST, Z] = lm[behind, RIGHT_SHOULDER, Z] + 0.2
+    lm[:, :, :3] += rng.normal(0.0, 0.002, (n, NUM_LANDMARKS, 3)).astype(np.float32)
+    lm[rng.random(n) < 0.01] = np.nan
+
+    ts = 1000.0 + np.arange(n) / FPS
+    return ts, lm
+
+
+def synthetic_labels(cycles=4):
+    """
+    (start, end, move) for every move of synthetic_session(cycles), in its
+    timestamps: from the move's first keyframe until the hands are back at rest.
+    """
+    labels, start = [], 0
+    for name, keys, t in _script(cycles):
+        move, t0 = MOVES[name], 1000.0 + start / FPS
+        labels.append((t0 + move[0][0], t0 + move[-1][0] + 0.4, name))
+        start += len(t)
+    return labels
+
+
+def recorded_session(path):
+    records = read_recording(path)
+    lm = np.array(records["landmarks"])
+    lm[records["has_pose"] == 0] = np.nan
+    return np.array(records["ts"]), lm, int(records["width"][0]), int(records["height"][0])
+
+
+# ---------- Sequence benchmark ----------
+def _run(ts, lm, width, height, per_frame=None):
+    state = GameState()
+    physics = BallPhysics(state)
+    logic = GameLogic(state, physics)
+    frames = [None if np.isnan(f[0, 0]) else f for f in lm]  # same arrays the pipeline would hand over
+    actions, gestures, last = Counter(), Counter(), None
+    for i, (now, landmarks) in enumerate(zip(ts.tolist(), frames)):
+        if per_frame is not None:
+            per_frame(i, True)
+        physics.advance(now)
+        snap = logic.update(i, now, landmarks, width, height)
+        if per_frame is not None:
+            per_frame(i, False)
+        if snap.action != last:  # labels stick between moves; count each time one starts
+            actions[snap.action] += 1
+            last = snap.action
+        if logic.gesture:
+            gestures[logic.gesture] += 1
+    return actions, gestures
+
+
+def bench_sequence(ts, lm, width=WIDTH, height=HEIGHT, repeat=3):
+    """Time every frame of a sequence; best of `repeat` runs, then one traced run for memory."""
+    n = len(ts)
+    best = None
+    for _ in range(repeat):
+        times = np.empty(n)
+        starts = [0.0]
+
+        def per_frame(i, before):
+            if before:
+                starts[0] = time.perf_counter()
+            else:
+                times[i] = time.perf_counter() - starts[0]
+
+        actions, gestures = _run(ts, lm, width, height, per_frame)
+        if best is None or times.sum() < best.sum():
+            best = times
+
+    # peak transient memory per frame (not an allocation count), traced separately so it doesn't skew the timings
+    peaks = np.empty(n)
+    base = [0]
+
+    def per_frame_mem(i, before):
+        if before:
+            tracemalloc.reset_peak()
+            base[0] = tracemalloc.get_traced_memory()[0]
+        else:
+            peaks[i] = tracemalloc.get_traced_memory()[1] - base[0]
+
+    tracemalloc.start()
+    _run(ts, lm, width, height, per_frame_mem)
+    tracemalloc.stop()
+
+    ms = best * 1000.0
+    return {
+        "frames": n,
+        "fps": round(n / best.sum(), 1),
+        "p50_ms": round(float(np.percentile(ms, 50)), 4),
+        "p95_ms": round(float(np.percentile(ms, 95)), 4),
+        "p99_ms": round(float(np.percentile(ms, 99)), 4),
+        "max_ms": round(float(ms.max()), 4),
+        "peak_bytes_per_frame": int(np.median(peaks)),
+        "actions": dict(sorted(actions.items())),
+        "gestures": dict(sorted(gestures.items())),
+    }
+
+
+# ---------- Micro benchmarks ----------
+def _per_call(fn, min_time=0.05, repeat=5):
+    """Seconds per call of fn(): best of `repeat` loops of at least min_time each."""
+    n = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(n):
+            fn()
+        if time.perf_counter() - start >= min_time:
+            break
+        n *= 2
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(n):
+            fn()
+        best = min(best, time.perf_counter() - start)
+    return best / n
+
+
+def bench_micro():
+    """Isolated costs in microseconds per call."""
+    lm = _body()
+    state = GameState()
+    state.landmarks = lm
+    state.keypoints = LazyKeypoints(lm)
+    state.publish(320.0, 240.0)
+    snap = state.snapshot
+    physics = BallPhysics(state)
+    physics.set_bounds(WIDTH, int(HEIGHT * 0.9))
+    shot_lm = lm.copy()
+    shot_lm[(LEFT_WRIST, RIGHT_WRIST), Y] = 0.05
+    detector = GestureDetector()
+    shot_speeds = (0.0, -40.0, 0.0, -40.0)
+    detector.measure(shot_lm, (300, 30), (340, 30), shot_speeds, (320, 30))
+    shot_state = GameState()
+    shot_state.hold_hand, shot_state.hold_start_time, shot_state.floor_y = "both", 0.0, int(HEIGHT * 0.9)
+
+    cases = {
+        "dist": lambda: dist((100, 200), (300, 400)),
+        "gesture_features": lambda: detector.measure(shot_lm, (300, 30), (340, 30), shot_speeds, (320, 30)),
+        "gesture_detect": lambda: detector.detect(shot_state, 1.0),
+        "physics_step": lambda: physics.step(0.0),
+        "extract_keypoints": lambda: extract_keypoints(lm),
+        # a fresh LazyKeypoints each call, like a new frame (the dict is built once per frame)
+        "encode_json": lambda: encode_json(snap._replace(keypoints=LazyKeypoints(lm))),
+        "encode_json_cached": lambda: encode_json(snap),
+        "encode_binary": lambda: encode_binary(snap),
+    }
+    return {name: round(_per_call(fn) * 1e6, 3) for name, fn in cases.items()}
+
+
+def bench_batch(sizes=(1, 8, 64, 512), frames=120):
+    """
+    Microseconds per tick (physics advance + gesture update) of game_batch.BatchGame
+    for N players, next to N scalar GameLogic sessions for comparison.
+    """
+    ts, lm = synthetic_session(1)
+    ts, lm = ts[:frames], lm[:frames]
+    valid = ~np.isnan(lm[:, 0, 0])
+    out = {}
+    for n in sizes:
+        game = BatchGame(n, WIDTH, HEIGHT)
+        batch_lm = np.repeat(lm[:, None], n, axis=1)
+        batch_valid = np.repeat(valid[:, None], n, axis=1)
+        start = time.perf_counter()
+        for i in range(frames):
+            game.advance(ts[i])
+            game.update(ts[i], batch_lm[i], batch_valid[i])
+        out[f"batch_{n}"] = round((time.perf_counter() - start) / frames * 1e6, 2)
+    for n in sizes[:2]:  # the scalar path gets slow quickly; a couple of sizes show the slope
+        sessions = [(BallPhysics(GameState()),) for _ in range(n)]
+        sessions = [(physics, GameLogic(physics.state, physics)) for (physics,) in sessions]
+        frames_lm = [None if not v else f for f, v in zip(lm, valid)]
+        start = time.perf_counter()
+        for i in range(frames):
+            for physics, logic in sessions:
+                physics.advance(ts[i])
+                logic.update(i, ts[i], frames_lm[i], WIDTH, HEIGHT)
+        out[f"scalar_{n}"] = round((time.perf_counter() - start) / frames * 1e6, 2)
+    return out
+
+
+def check_batch(cycles=2, players=3):
+    """
+    Frames where game_batch.BatchGame disagrees with GameLogic (action, ball
+    position or the move that fired), over a few synthetic players.
+    """
+    seqs = [synthetic_session(cycles, seed=seed) for seed in range(players)]
+    n = min(len(ts) for ts, _ in seqs)
+    ts = seqs[0][0][:n]
+    lm = np.stack([s[:n] for _, s in seqs], axis=1)
+    valid = ~np.isnan(lm[:, :, 0, 0])
+    expected = []
+    for j in range(players):
+        physics = BallPhysics(GameState())
+        logic = GameLogic(physics.state, physics)
+        rows = []
+        for i in range(n):
+            physics.advance(ts[i])
+            snap = logic.update(i, ts[i], lm[i, j] if valid[i, j] else None, WIDTH, HEIGHT)
+            rows.append((snap.action, physics.state.ball_x, physics.state.ball_y, logic.gesture))
+        expected.append(rows)
+    game = BatchGame(players, WIDTH, HEIGHT)
+    mismatches = 0
+    for i in range(n):
+        game.advance(ts[i])
+        game.update(ts[i], lm[i], valid[i], frame_id=i)
+        bx, by = game.sample()
+        for j in range(players):
+            action, x, y, gesture = expected[j][i]
+            snap = game.snapshot(j, (bx[j], by[j]))
+            mismatches += (snap.action != action or abs(game.ball_x[j] - x) > 1e-6 or abs(game.ball_y[j] - y) > 1e-6
+                           or LABELS[game.gesture[j]] != gesture)
+    return mismatches
+
+
+# ---------- Baseline ----------
+def behaviour(results):
+    """The machine-independent part of the results: counts per sequence."""
+    return {
+        name: {key: r[key] for key in ("frames", "actions", "gestures")}
+        for name, r in results["sequences"].items()
+    }
+
+
+def compare_behaviour(results, expected):
+    """Lines describing changed counts; every change is a regression."""
+    lines, regressions = [], 0
+    for name, cur in behaviour(results).items():
+        old = expected.get(name)
+        if old is None:
+            continue
+        if cur["frames"] != old["frames"]:
+            lines.append(f"  {name:<24} not comparable: {cur['frames']} frames, saved with {old['frames']}")
+            continue
+        for key in ("actions", "gestures"):
+            if cur[key] != old.get(key):
+                regressions += 1
+                lines.append(f"  {name:<24} {key} changed: {old.get(key)} -> {cur[key]}")
+        if cur == old:
+            lines.append(f"  {name:<24} same actions and moves")
+    return lines, regressions
+
+
+def compare(results, baseline):
+    """Lines describing timing changes from the baseline; regressions are marked."""
+    lines, regressions = [], 0
+    for name, cur in results["sequences"].items():
+        old = baseline.get("sequences", {}).get(name)
+        if old is None:
+            continue
+        fps_change = cur["fps"] / old["fps"] - 1.0
+        p95_change = cur["p95_ms"] / old["p95_ms"] - 1.0 if old["p95_ms"] else 0.0
+        bad = fps_change < -FPS_TOLERANCE or p95_change > LATENCY_TOLERANCE
+        regressions += bad
+        lines.append(f"  {name:<24} fps {fps_change:+.0%}  p95 {p95_change:+.0%}" + ("  REGRESSION" if bad else ""))
+    for name, us in {**results["micro"], **results["batch"]}.items():
+        old = {**baseline.get("micro", {}), **baseline.get("batch", {})}.get(name)
+        if old:
+            change = us / old - 1.0
+            bad = change > LATENCY_TOLERANCE
+            regressions += bad
+            lines.append(f"  {name:<24} {change:+.0%}" + ("  REGRESSION" if bad else ""))
+    return lines, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--recording", action="append", default=[], help="recorded session to replay (repeatable)")
+    parser.add_argument("--cycles", type=int, default=4, help="synthetic session length, in passes over every move")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="timings to compare with (local)")
+    parser.add_argument("--behaviour", default=BEHAVIOUR_PATH, help="action and move counts to compare with (committed)")
+    parser.add_argument("--save", action="store_true", help="save these results as the new baseline (both files)")
+    args = parser.parse_args()
+
+    sequences = {"synthetic": synthetic_session(args.cycles) + (WIDTH, HEIGHT)}
+    for path in args.recording:
+        sequences[os.path.basename(path)] = recorded_session(path)
+
+    results = {"python": sys.version.split()[0], "sequences": {}, "micro": {}, "batch": {}}
+    for name, (ts, lm, width, height) in sequences.items():
+        r = results["sequences"][name] = bench_sequence(ts, lm, width, height)
+        print(f"{name}: {r['frames']} frames, {r['fps']:.0f} fps, "
+              f"frame p50/p95/p99/max {r['p50_ms']}/{r['p95_ms']}/{r['p99_ms']}/{r['max_ms']} ms, "
+              f"{r['peak_bytes_per_frame']} B peak transient memory per frame")
+        print(f"  actions: {r['actions']}")
+        print(f"  moves: {r['gestures']}")
+    results["micro"] = bench_micro()
+    for name, us in results["micro"].items():
+        print(f"{name:<24} {us:8.2f} us")
+    results["batch"] = bench_batch()
+    print("per tick, N players: " + ", ".join(f"{name} {us:.0f} us" for name, us in results["batch"].items()))
+    mismatches = check_batch()
+    print(f"batch vs scalar: {mismatches} mismatched player frames")
+
+    regressions = mismatches
+    if os.path.exists(args.behaviour):
+        with open(args.behaviour) as f:
+            lines, changed = compare_behaviour(results, json.load(f))
+        regressions += changed
+        print(f"vs {args.behaviour}:")
+        print("\n".join(lines) or "  nothing comparable")
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            lines, changed = compare(results, json.load(f))
+        regressions += changed
+        print(f"vs {args.baseline}:")
+        print("\n".join(lines) or "  nothing comparable")
+    elif not args.save:
+        print(f"no baseline at {args.baseline}; run with --save to create one (before your change)")
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        with open(args.behaviour, "w") as f:
+            json.dump(behaviour(results), f, indent=2)
+            f.write("\n")
+        print(f"saved baseline to {args.baseline} and {args.behaviour}")
+    return 1 if regressions and not args.save else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -29,3 +29,97 @@ MIN_HOLD_BEFORE_RELEASE = 0.08
 
 # --- Side Movement ---
 SIDE_ASSIST_DURATION = 0.15
+
+# --- Pipeline ---
+PIPELINE_QUEUE_SIZE = 1   # frames buffered between stages (latest frame wins)
+
+# --- Pose inference ---
+INFERENCE_MODE = "thread"   # "thread" = Pose in this process, "process" = worker process + shared memory
+POSE_WORKER_SLOTS = 2       # shared-memory frame slots for the worker
+POSE_WORKER_TIMEOUT = 1.0   # seconds to wait for a worker result before skipping the frame
+
+# --- Physics tick ---
+PHYSICS_HZ = 120          # fixed integration rate, independent of camera / pose fps
+PHYSICS_REF_FPS = 30      # frame rate the physics and speed constants above were tuned at
+PHYSICS_MAX_STEPS = 30    # max substeps per tick (0.25 s) before dropping the backlog
+
+# --- Broadcast hub ---
+HUB_MAX_RATE = 60          # max broadcasts per second (snapshots are published faster than this)
+HUB_CLIENT_MAX_RATE = 60   # default and max per-client send rate; clients may ask for less with ?rate=N
+HUB_HEARTBEAT = 1.0        # re-send the last snapshot after this many idle seconds
+
+# --- Session recording (see recorder.py) ---
+RECORD_PATH = None   # e.g. "session.bbrc" to record every processed frame for replay
+
+# --- Stats (see telemetry.py) ---
+STATS_PORT = 8766          # local HTTP/websocket stats endpoint; None to disable
+STATS_INTERVAL = 1.0       # seconds between reports streamed to a stats websocket
+STATS_LOG_INTERVAL = 10.0  # seconds between [stats] log lines; 0 to disable
+
+# --- Display ---
+HEADLESS = False   # no overlay and no window; stop with Ctrl+C / SIGTERM or a {"type": "shutdown"} message
+PREVIEW_FPS = 0    # headless only: if > 0, show a debug preview window at this rate
+
+# --- Court server (court.py) ---
+CAMERA_SOURCES = [0]   # camera indices or video files / stream URLs, one player each
+COURT_WORKERS = None   # pose worker processes; None = one per source, at most cores - 1
+COURT_PORT = 8765
+
+# --- Adaptive quality (see quality.py) ---
+TARGET_FPS = 30                # camera frames per second to keep up with; 0 keeps the first level
+QUALITY_LEVELS = [             # best first: (model_complexity, downscale, skip, overlay); each step must cut inference time
+    (1, 1.0, 1, True),
+    (1, 0.75, 1, False),
+    (0, 0.75, 1, False),
+    (0, 0.5, 1, False),
+    (0, 0.5, 2, False),
+    (0, 0.5, 3, False),
+]
+QUALITY_HOLD = 2.0             # seconds a level is measured before the next change
+QUALITY_HEADROOM = 1.5         # step back up only when this far under the frame budget
+QUALITY_RETRY = 30.0           # seconds before retrying a level that could not hold the target
+QUALITY_REPORT_INTERVAL = 5.0  # seconds between quality messages to clients when nothing changes
+
+# --- Region of interest (see roi.py) ---
+ROI_ENABLED = True        # crop inference input to the player once a pose has been found
+ROI_MARGIN = 0.25         # crop = landmark bounding box grown by this fraction of its size per side
+ROI_MIN_VISIBILITY = 0.3  # landmarks less visible than this do not count toward the box
+ROI_MAX_SIDE = 480        # inference input is shrunk to at most this many pixels on its longer side; None = never
+
+# --- Tracking between inferences (see tracking.py) ---
+INFERENCE_EVERY = 1     # full pose inference on every Nth camera frame; 1 = every frame
+TRACK_METHOD = "flow"   # frames in between: "flow" (optical flow), "extrapolate", or None to drop them
+TRACK_MAX_SIDE = 320    # optical flow runs on a grayscale copy at most this many pixels on its longer side
+
+# --- Client prediction (see prediction.py) ---
+PREDICT = True                 # add predicted ball positions for the client's render time to every message
+PREDICT_CLIENT_DELAY = 0.03    # seconds from receiving a message to showing it in Unity, on top of the measured delay
+PREDICT_MAX_HORIZON = 0.15     # never extrapolate further ahead than this many seconds
+HAND_VELOCITY_SMOOTHING = 0.5  # EMA weight of the newest hand speed in the filtered hand velocity
+
+# --- Logging (see ratelog.py) ---
+LOG_RATE = 2           # lines per second per log key on hot paths (e.g. Unity input)
+LOG_QUEUE_SIZE = 1000  # lines waiting for the writer thread before new ones are dropped
+
+# --- Ball flights (see trajectory.py) ---
+TRAJECTORIES = True               # send one parametric flight per release instead of per-tick positions
+TRAJECTORY_HORIZON = 5.0          # seconds of flight planned ahead at most
+TRAJECTORY_TOLERANCE = 2.0        # pixels the ball may drift from its plan before positions stream again
+TRAJECTORY_REPLAN_INTERVAL = 0.25  # a ball drifting again sooner than this streams until left alone this long
+
+# --- Startup ---
+WARMUP_FRAMES = 3        # pose inferences on the first camera frame before going live (0 = none)
+WARMUP_TIMEOUT = 30.0    # seconds to wait for the pose model (worker process) to load
+
+# --- Video side-channel (see video.py) ---
+VIDEO_ENABLED = True     # serve the camera feed as JPEG on VIDEO_PATH (encoded only while a client watches)
+VIDEO_PATH = "/video"    # websocket path of the feed on the game server port
+VIDEO_WIDTH = 320        # encoded width in pixels (height keeps the aspect ratio)
+VIDEO_FPS = 15           # frames per second encoded at most
+VIDEO_QUALITY = 70       # JPEG quality, 0-100
+
+# --- Session log (see sessionlog.py) ---
+SESSION_LOG_DIR = None        # e.g. "sessions": keep a columnar per-frame log of every session for stats
+SESSION_LOG_CHUNK = 1024      # rows buffered per chunk before the writer thread appends them (~34 s at 30 fps)
+SESSION_LOG_BUFFERS = 4       # preallocated chunks; another is allocated if the disk falls behind
+SESSION_LOG_LANDMARKS = True  # also keep every frame's (33, 4) pose (~0.5 KB per frame)
@@ -0,0 +1,294 @@
+"""
+Multi-station court server: several cameras (or video files), one player each.
+
+Capture and pose inference run in a pool of worker processes sized to the
+machine (COURT_WORKERS, default one per source up to cores - 1; a worker
+with several sources takes them in turn). Only the small landmarks arrays
+come back. The main process keeps every player's game in one
+game_batch.BatchGame and steps them together; each player has an
+isolated state and its own BroadcastHub, served on its own path:
+
+    ws://localhost:8765/player/0   (also plain ws://localhost:8765/)
+    ws://localhost:8765/player/1   ...
+
+    python court.py 0 1 clips/station3.mp4
+"""
+import asyncio
+import multiprocessing
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+import cv2
+import numpy as np
+import websockets
+
+from config import CAMERA_SOURCES, COURT_PORT, COURT_WORKERS
+from game_batch import BatchGame
+from hub import BroadcastHub
+from inputs import InputMailbox, parse_message
+from pose_stream import NUM_LANDMARKS
+from protocol import select_subprotocol
+from ratelog import log
+from telemetry import serve_stats, telemetry
+
+POSE_OPTIONS = dict(min_detection_confidence=0.5, min_tracking_confidence=0.5)
+
+
+def parse_source(text):
+    """A command-line source: digits are a camera index, anything else a file path or stream URL."""
+    return int(text) if text.isdigit() else text
+
+
+def pool_size(sources, workers=COURT_WORKERS):
+    if workers:
+        return max(1, min(workers, len(sources)))
+    return max(1, min(len(sources), (os.cpu_count() or 2) - 1))  # leave a core for the game loop
+
+
+# ---------- Worker processes ----------
+class _Station:
+    """One source in a worker: its capture, its own Pose (tracking state is per stream)."""
+
+    def __init__(self, player, source, pose_options):
+        from pose_worker import LocalPose
+        from roi import RoiTracker
+
+        self.player = player
+        self.source = source
+        self.is_file = isinstance(source, str) and os.path.exists(source)
+        self.cap = cv2.VideoCapture(source)
+        self.pose = LocalPose(**pose_options)
+        self.roi = RoiTracker()
+        fps = self.cap.get(cv2.CAP_PROP_FPS) if self.is_file else 0
+        self.interval = 1.0 / fps if fps and fps > 0 else 0  # play files back at their own rate
+        self.next_due = 0.0
+        self.frame_id = 0
+
+    def read(self):
+        """(player, frame_id, ts, width, height, landmarks) for the next frame, or None when done."""
+        if self.interval:
+            wait = self.next_due - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self.next_due = max(self.next_due, time.monotonic() - self.interval) + self.interval
+        ok, frame = self.cap.read()
+        if not ok and self.is_file:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)  # test clips loop
+            ok, frame = self.cap.read()
+        if not ok:
+            return None
+        ts = time.time()
+        frame = cv2.flip(frame, 1)
+        h, w = frame.shape[:2]
+        image, box = self.roi.crop(frame)
+        landmarks = self.roi.track(self.pose.process(image, self.frame_id), box)
+        self.frame_id += 1
+        return self.player, self.frame_id - 1, ts, w, h, landmarks
+
+    def close(self):
+        self.cap.release()
+        self.pose.close()
+
+
+def _station_main(sources, results, stop, pose_options):
+    """Worker process: capture + pose for its share of the sources, landmarks out on `results`."""
+    stations = [_Station(player, source, pose_options) for player, source in sources]
+    try:
+        while stations and not stop.is_set():
+            for station in list(stations):
+                item = station.read()
+                if item is None:
+                    print(f"Player {station.player}: source {station.source!r} ended")
+                    stations.remove(station)
+                    station.close()
+                    continue
+                results.put(item)
+    finally:
+        for station in stations:
+            station.close()
+
+
+# ---------- Game side ----------
+class PlayerFeed:
+    """What a BroadcastHub reads: the player's latest published snapshot."""
+
+    __slots__ = ("snapshot",)
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+
+
+class Court:
+    """Worker pool + one BatchGame for all players + one hub per player."""
+
+    def __init__(self, sources, workers=COURT_WORKERS, pose_options=POSE_OPTIONS):
+        self.sources = list(sources)
+        self.n = n = len(self.sources)
+        self.game = BatchGame(n)
+        self.feeds = [PlayerFeed(self.game.snapshot(i)) for i in range(n)]
+        self.hubs = [BroadcastHub(feed) for feed in self.feeds]
+        # joystick input per player, coalesced and applied at the start of each tick
+        self.inputs = [InputMailbox(lambda values, i=i: self._set_move(i, values)) for i in range(n)]
+
+        ctx = multiprocessing.get_context("spawn")
+        self.results = ctx.Queue()
+        self._worker_stop = ctx.Event()
+        k = pool_size(self.sources, workers)
+        shares = [[(p, s) for p, s in enumerate(self.sources) if p % k == w] for w in range(k)]
+        self.workers = [
+            ctx.Process(target=_station_main, args=(share, self.results, self._worker_stop, pose_options),
+                        name=f"station-{w}", daemon=True)
+            for w, share in enumerate(shares)
+        ]
+
+        # per-tick inputs to BatchGame.update, reused
+        self._landmarks = np.zeros((n, NUM_LANDMARKS, 4), dtype=np.float32)
+        self._valid = np.zeros(n, dtype=bool)
+        self._fresh = np.zeros(n, dtype=bool)
+        self._now = np.zeros(n)
+        self._frame_id = np.zeros(n, dtype=np.int64)
+        self._published = np.full((2, n), np.nan)  # last published ball x, y per player
+        self.dropped = 0
+
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        for w in self.workers:
+            w.start()
+        print(f"Court: {self.n} players on {len(self.workers)} worker processes")
+        telemetry.gauge("dropped_court", lambda: self.dropped)
+        self._thread = threading.Thread(target=self._run, name="court", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._worker_stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        for w in self.workers:
+            w.join(timeout=3)
+            if w.is_alive():
+                w.terminate()
+        self.results.cancel_join_thread()
+        self.results.close()
+
+    def _set_move(self, i, values):
+        self.game.move[i] = values[:2]
+
+    def _drain(self, timeout):
+        """Collect every result that has arrived; True if any did."""
+        fresh = self._fresh
+        fresh[:] = False
+        try:
+            item = self.results.get(timeout=timeout)
+            while True:
+                player, frame_id, ts, w, h, landmarks = item
+                if fresh[player]:
+                    self.dropped += 1  # two frames for one player in a tick: the newer wins
+                fresh[player] = True
+                self._now[player], self._frame_id[player] = ts, frame_id
+                self._valid[player] = landmarks is not None
+                if landmarks is not None:
+                    self._landmarks[player] = landmarks
+                if w != self.game.width[player] or h != self.game.height[player]:
+                    self.game.set_frame_size(w, h, player)
+                item = self.results.get_nowait()
+        except queue.Empty:
+            pass
+        return fresh.any()
+
+    def _run(self):
+        game = self.game
+        while not self._stop.is_set():
+            got = self._drain(game.dt)
+            t0 = time.perf_counter()
+            for inputs in self.inputs:
+                inputs.tick()
+            game.advance(time.time())
+            if got:
+                game.update(self._now, self._landmarks, self._valid, self._fresh, self._frame_id)
+            self._publish()
+            telemetry.record("court", time.perf_counter() - t0)
+            if got:
+                telemetry.record("logic", time.perf_counter() - t0)
+
+    def _publish(self):
+        """New snapshots for watched players whose frame or ball changed."""
+        x, y = self.game.sample()
+        last_x, last_y = self._published
+        moved = ~(np.abs(x - last_x) + np.abs(y - last_y) <= 0.05)  # NaN (never published) counts as moved
+        watched = np.fromiter((bool(h.subscribers) for h in self.hubs), dtype=bool, count=self.n)
+        for i in np.flatnonzero((self._fresh | moved) & watched):
+            self.feeds[i].snapshot = self.game.snapshot(i, (float(x[i]), float(y[i])))
+            last_x[i], last_y[i] = x[i], y[i]
+            self.hubs[i].notify()
+
+
+def player_index(path, n):
+    """Player for a websocket path: "/" or "/player/<i>"; None if there is no such player."""
+    parts = [p for p in urlsplit(path).path.split("/") if p]
+    if not parts:
+        return 0
+    if len(parts) == 2 and parts[0] == "player" and parts[1].isdigit() and int(parts[1]) < n:
+        return int(parts[1])
+    return None
+
+
+# ---------- Server ----------
+async def serve_court(sources, port=COURT_PORT):
+    court = Court(sources)
+    shutdown = threading.Event()
+
+    def route(connection, request):
+        if player_index(request.path, court.n) is None:
+            return connection.respond(404, f"no such player; use /player/0 .. /player/{court.n - 1}\n")
+        return None
+
+    async def handle_player(websocket):
+        i = player_index(websocket.request.path, court.n)
+        log(("connect", i), "Client connected to player {}", i)
+        send_task = asyncio.create_task(court.hubs[i].serve(websocket))
+        try:
+            async for message in websocket:
+                kind, data = parse_message(message)
+                if kind == "input":
+                    court.inputs[i].offer(data)
+                elif kind == "shutdown":
+                    log("shutdown", "Shutdown requested by player {}'s client", i)
+                    shutdown.set()
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            send_task.cancel()
+        log(("disconnect", i), "Client of player {} disconnected", i)
+
+    server = await websockets.serve(
+        handle_player, "localhost", port,
+        select_subprotocol=select_subprotocol, process_request=route,
+    )
+    print(f"Court server at ws://localhost:{port}/player/0 .. /player/{court.n - 1}")
+    for hub in court.hubs:
+        hub.start()
+    await serve_stats()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: shutdown.set())
+
+    court.start()
+    try:
+        await asyncio.to_thread(shutdown.wait)
+    finally:
+        court.stop()
+        server.close()
+        await server.wait_closed()
+        log.flush()  # the shutdown / disconnect lines may still be queued
+
+
+if __name__ == "__main__":
+    sources = [parse_source(a) for a in sys.argv[1:]] or CAMERA_SOURCES
+    asyncio.run(serve_court(sources))
@@ -1,10 +1,12 @@
-from utils import *
+import time
 
-def release_ball_downward(state):
-    state["holding"] = False
-    state["hit_cooldown"] = True
-    state["last_hit_time"] = time.time()
-    state["ball_vy"] = DRIBBLE_FORCE * 1.2
-    state["dribble_energy"] = DRIBBLE_FORCE * 0.8
-    state["BALL_COLOR"] = BALL_COLOR_RELEASE
-    state["last_label"] = "Dribble"
+from config import BALL_COLOR_RELEASE, DRIBBLE_FORCE
+
+def release_ball_downward(state, now=None):
+    state.holding = False
+    state.hit_cooldown = True
+    state.last_hit_time = time.time() if now is None else now
+    state.ball_vy = DRIBBLE_FORCE * 1.2
+    state.dribble_energy = DRIBBLE_FORCE * 0.8
+    state.ball_color = BALL_COLOR_RELEASE
+    state.last_label = "Dribble"
@@ -0,0 +1,129 @@
+from dribble import *
+from utils import *
+from pose_stream import LazyKeypoints, LEFT_WRIST, RIGHT_WRIST
+from physics import ref_frames
+from game_state import gesture_config
+from gestures import GestureDetector, F_LEFT_DIST, F_RIGHT_DIST
+
+
+class GameLogic:
+    """
+    Per-frame hand / ball interaction and gesture logic for one player.
+
+    Shared by main.py, main2.py and headless replay. It never reads the
+    clock: `now` is always the frame's own timestamp, so a recorded
+    session replays exactly as it was played. Only state the physics
+    step times itself (the side-move assist) is stamped with the physics
+    clock, physics.sim_time, which replay drives with the same timestamps.
+    """
+
+    def __init__(self, state, physics, unity_input=None, config=None):
+        self.state = state
+        self.physics = physics
+        self.unity_input = unity_input  # joystick / WASD from Unity (main2), or None
+        self.config = config or gesture_config()  # game_state.GestureConfig thresholds
+        self.detector = GestureDetector(self.config)  # gestures.MOVES, compiled with those thresholds
+        self.prev_left = self.prev_right = self.prev_ts = None
+        self.left_speed_x = self.left_speed_y = 0
+        self.right_speed_x = self.right_speed_y = 0
+        self.hand_v = (0.0, 0.0, 0.0, 0.0)  # smoothed speeds, for client prediction
+        self.gesture = ""  # the move that fired on the last frame (a gestures.LABELS name), or ""
+
+    def update(self, frame_id, now, landmarks, w, h):
+        """Run one frame (landmarks: (33, 4) array or None) and publish the resulting snapshot."""
+        with self.physics.lock:  # the physics thread must not step in the middle of a gesture
+            self._update(frame_id, now, landmarks, w, h)
+            self.physics.publish()
+        return self.state.snapshot
+
+    def _update(self, frame_id, now, lm, w, h):
+        state, cfg = self.state, self.config
+        floor_y = int(h * 0.90)
+        self.physics.set_bounds(w, floor_y)
+
+        state.frame_id, state.ts = frame_id, now
+        self.gesture = ""
+        state.keypoints = LazyKeypoints(lm)
+        state.landmarks = lm
+        state.floor_y = floor_y
+
+        right = left = None
+        if lm is not None:
+            # both wrists to pixels in one go
+            right, left = map(tuple, (lm[(RIGHT_WRIST, LEFT_WRIST), :2] * (w, h)).astype(int).tolist())
+
+        # --- Hand speed (pixels per reference frame, so dropped/slow frames don't change it) ---
+        frames = ref_frames(now - self.prev_ts) if self.prev_ts is not None else 1.0
+        self.prev_ts = now
+        prev_left, prev_right = self.prev_left, self.prev_right
+        left_speed_x, left_speed_y = self.left_speed_x, self.left_speed_y
+        right_speed_x, right_speed_y = self.right_speed_x, self.right_speed_y
+        if left and prev_left:
+            left_speed_y = (left[1] - prev_left[1]) / frames
+            left_speed_x = (left[0] - prev_left[0]) / frames
+        if right and prev_right:
+            right_speed_y = (right[1] - prev_right[1]) / frames
+            right_speed_x = (right[0] - prev_right[0]) / frames
+        self.prev_left, self.prev_right = left, right
+        self.left_speed_x, self.left_speed_y = left_speed_x, left_speed_y
+        self.right_speed_x, self.right_speed_y = right_speed_x, right_speed_y
+        a = HAND_VELOCITY_SMOOTHING
+        self.hand_v = tuple(
+            v + a * (s - v)
+            for v, s in zip(self.hand_v, (left_speed_x, left_speed_y, right_speed_x, right_speed_y))
+        )
+        state.hand_v = self.hand_v if lm is not None else None
+
+        # --- Apply Unity joystick offset ---
+        if self.unity_input is not None:
+            state.ball_x += self.unity_input["move_x"] * 5 * frames
+            state.ball_y -= self.unity_input["move_y"] * 5 * frames
+
+        # --- Hand interaction logic ---
+        state.ball_color = BALL_COLOR_DEFAULT
+        if right or left:
+            # every distance, speed and pose feature the rules read, once (gestures.py)
+            f = self.detector.measure(
+                lm, left, right, (left_speed_x, left_speed_y, right_speed_x, right_speed_y), (state.ball_x, state.ball_y)
+            )
+            nearL = f[F_LEFT_DIST] < cfg.HOLD_DIST
+            nearR = f[F_RIGHT_DIST] < cfg.HOLD_DIST
+
+            if (nearL or nearR) and not state.hit_cooldown:
+                if not state.holding:
+                    state.hold_start_time = now
+                state.holding = True
+                state.hold_hand = "both" if (nearL and nearR) else "left" if nearL else "right"
+            else:
+                if state.holding:
+                    too_far = f[F_LEFT_DIST] >= cfg.RELEASE_DIST and f[F_RIGHT_DIST] >= cfg.RELEASE_DIST
+                    if too_far:
+                        release_ball_downward(state, now)
+
+            if state.holding:
+                if state.hold_hand == "left" and left:
+                    state.ball_x, state.ball_y, state.ball_vx = left[0], left[1], left_speed_x
+                elif state.hold_hand == "right" and right:
+                    state.ball_x, state.ball_y, state.ball_vx = right[0], right[1], right_speed_x
+                elif state.hold_hand == "both" and left and right:
+                    state.ball_x = (left[0] + right[0]) // 2
+                    state.ball_y = (left[1] + right[1]) // 2
+                    state.ball_vx = (left_speed_x + right_speed_x) / 2
+
+                state.ball_color = BALL_COLOR_HOLD
+
+                if state.ball_y >= floor_y - BALL_RADIUS * 0.2:
+                    state.ball_y = floor_y
+                    release_ball_downward(state, now)
+
+                # dribbles, crosses, shots: the first of gestures.MOVES whose conditions hold
+                move = self.detector.detect(state, now)
+                if move is not None:
+                    sim_time = self.physics.sim_time
+                    move.effect.apply(state, now, f, move.name, now if sim_time is None else sim_time)
+                    self.gesture = move.name
+
+            if state.hit_cooldown and now - state.last_hit_time > COOLDOWN:
+                state.hit_cooldown = False
+        else:
+            state.holding, state.hold_hand, state.dribble_energy = False, None, 0
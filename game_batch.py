@@ -0,0 +1,360 @@
+"""
+Vectorized gesture + ball engine for many players at once.
+
+BatchGame keeps N sessions' ball and hand state in NumPy arrays (one slot
+per player) and runs the same rules as game.GameLogic, dribble.py,
+shoot.py and physics.BallPhysics, with the per-player `if` branches
+turned into boolean masks. The moves are gestures.MOVES itself: the same
+feature vector, one row per session, and each move's conditions
+evaluated as masks in priority order. One update() / advance() call moves every
+player, so the per-tick cost is a fixed number of array operations
+whatever N is.
+
+    game = BatchGame(8, width=640, height=480)
+    game.advance(now)                   # fixed-step ball physics, all sessions
+    game.update(now, landmarks, valid)  # landmarks (8, 33, 4), valid (8,) bool
+    game.snapshot(3)                    # game_state.Snapshot for player 3
+"""
+import numpy as np
+
+from config import (
+    BALL_RADIUS, COOLDOWN, DRIBBLE_FORCE, ELASTICITY, FRICTION, GRAVITY,
+    HAND_VELOCITY_SMOOTHING, PHYSICS_HZ, PHYSICS_MAX_STEPS, PHYSICS_REF_FPS, SIDE_ASSIST_DURATION,
+    BALL_COLOR_DEFAULT, BALL_COLOR_HOLD, BALL_COLOR_RELEASE, BALL_COLOR_REAL_SHOT, BALL_COLOR_FAKE_SHOT,
+)
+from game_state import Snapshot, action_name, gesture_config
+from gestures import (
+    FEATURES, LABELS, MOVES, Cross, Release, Shot, compile_conditions,
+    F_LEFT_DIST, F_RIGHT_DIST, F_LEFT_VX, F_LEFT_VY, F_RIGHT_VX, F_RIGHT_VY, F_LEFT_DEPTH, F_RIGHT_DEPTH,
+    F_HEAD_CLEARANCE, F_STRETCH, F_HAND_VX, F_HAND_VY, F_HAND_DEPTH, F_HOLD_TIME, F_HEIGHT,
+)
+from pose_stream import (
+    LazyKeypoints, NUM_LANDMARKS, NOSE, LEFT_SHOULDER, RIGHT_SHOULDER,
+    LEFT_ELBOW, RIGHT_ELBOW, LEFT_WRIST, RIGHT_WRIST, Y, Z,
+)
+from protocol import ACTION_CODES, ACTION_UNKNOWN
+
+put = np.copyto  # masked in-place write: put(dst, values, where=mask)
+
+# hold_hand codes
+NO_HAND, LEFT, RIGHT, BOTH = 0, 1, 2, 3
+HAND_NAMES = (None, "left", "right", "both")
+
+# label codes are gestures.LABELS indices: 0 is "no label yet", 1 the plain release, then the moves
+NO_LABEL, L_DRIBBLE = 0, 1
+
+_COMPARE = {">": np.greater, "<": np.less, ">=": np.greater_equal, "<=": np.less_equal}
+
+# ball color codes
+COLORS = (BALL_COLOR_DEFAULT, BALL_COLOR_HOLD, BALL_COLOR_RELEASE, BALL_COLOR_REAL_SHOT, BALL_COLOR_FAKE_SHOT)
+C_DEFAULT, C_HOLD, C_RELEASE, C_REAL_SHOT, C_FAKE_SHOT = range(len(COLORS))
+
+
+def _action(label, holding, hand):
+    """game_state.detect_action for one session's codes."""
+    if label:
+        return action_name(LABELS[label])
+    if holding:
+        return f"holding_{HAND_NAMES[hand] or 'auto'}"
+    return "dribbling"
+
+
+# protocol action code for every (label, holding, hand) combination, so actions are one table lookup
+_ACTION_TABLE = np.array([
+    [[ACTION_CODES.get(_action(label, holding, hand), ACTION_UNKNOWN) for hand in range(4)] for holding in (0, 1)]
+    for label in range(len(LABELS))
+], dtype=np.uint8)
+
+
+class BatchGame:
+    """N players' game state as arrays, advanced together."""
+
+    def __init__(self, n, width=640, height=480, hz=PHYSICS_HZ, config=None):
+        self.n = n
+        self.config = config or gesture_config()  # GestureConfig; fields may be (n,) arrays
+        f = lambda value=0.0: np.full(n, value, dtype=np.float64)
+        b = lambda: np.zeros(n, dtype=bool)
+
+        # --- Ball and player state (GameState fields) ---
+        self.ball_x, self.ball_y = f(320.0), f(200.0)
+        self.ball_vx, self.ball_vy = f(), f()
+        self.dribble_energy = f()
+        self.holding = b()
+        self.hold_hand = np.zeros(n, dtype=np.int8)
+        self.hold_start_time, self.last_hit_time = f(), f()
+        self.hit_cooldown = b()
+        self.side_mode, self.side_mode_time = b(), f()
+        self.ball_color = np.zeros(n, dtype=np.int8)
+        self.label = np.zeros(n, dtype=np.int8)
+        self.gesture = np.zeros(n, dtype=np.int8)  # the move that fired in the last update (LABELS code), or NO_LABEL
+        self.features = np.zeros((n, len(FEATURES)))  # gestures.FEATURES of the last update, one row per session
+        self.frame_id = np.full(n, -1, dtype=np.int64)
+        self.ts = f()
+        self.landmarks = np.zeros((n, NUM_LANDMARKS, 4), dtype=np.float32)
+        self.valid = b()  # landmarks holds a pose for this session
+
+        # --- Per-session frame size ---
+        self.width, self.height = f(width), f(height)
+        self.floor_y = f(int(height * 0.90))
+
+        # --- Hand tracking (GameLogic fields) ---
+        self.prev_hands = np.zeros((n, 2, 2), dtype=np.int64)  # [session, left/right, x/y] in pixels
+        self.prev_valid = b()
+        self.prev_ts = f(np.nan)
+        self.speed = np.zeros((n, 2, 2))  # same layout as prev_hands
+        self.hand_v = np.zeros((n, 2, 2))  # smoothed speed, for client prediction
+        self.seq = np.zeros(n, dtype=np.int64)  # snapshots published per session
+        self.move = np.zeros((n, 2))  # Unity joystick (move_x, move_y) per session, as in main2.py
+
+        # --- Physics (BallPhysics fields) ---
+        self.dt = 1.0 / hz
+        self.k = PHYSICS_REF_FPS * self.dt
+        self.friction = FRICTION ** self.k
+        self.sim_time = None
+        self.accumulator = 0.0
+        self.prev_x, self.prev_y = self.ball_x.copy(), self.ball_y.copy()  # before / after the last step
+        self.cur_x, self.cur_y = self.ball_x.copy(), self.ball_y.copy()
+
+        # --- Moves: (move, hold hand codes, conditions, label code), thresholds from this config ---
+        self.moves = []
+        for move in MOVES:
+            if not isinstance(move.effect, (Release, Cross, Shot)):
+                raise TypeError(f"{move.name}: BatchGame has no vectorized {type(move.effect).__name__} effect")
+            hands = tuple(HAND_NAMES.index(hand) for hand in move.hands)
+            self.moves.append((move, hands, compile_conditions(move, self.config), LABELS.index(move.name)))
+
+    # ---------- Helpers ----------
+    def _release_downward(self, mask, now):
+        """dribble.release_ball_downward for every session in mask."""
+        put(self.holding, False, where=mask)
+        put(self.hit_cooldown, True, where=mask)
+        put(self.last_hit_time, now, where=mask)
+        put(self.ball_vy, DRIBBLE_FORCE * 1.2, where=mask)
+        put(self.dribble_energy, DRIBBLE_FORCE * 0.8, where=mask)
+        put(self.ball_color, C_RELEASE, where=mask)
+        put(self.label, L_DRIBBLE, where=mask)
+
+    def set_frame_size(self, width, height, sessions=slice(None)):
+        self.width[sessions], self.height[sessions] = width, height
+        self.floor_y[sessions] = int(height * 0.90)
+
+    # ---------- Gesture step ----------
+    def update(self, now, landmarks, valid, fresh=None, frame_id=None):
+        """
+        One frame of gesture logic for every session in `fresh` (default: all).
+
+        now       (N,) or scalar capture time of each session's frame
+        landmarks (N, 33, 4) pose arrays; rows where valid is False are ignored
+        valid     (N,) bool, a pose was found in that session's frame
+        """
+        n, cfg = self.n, self.config
+        now = np.broadcast_to(np.asarray(now, dtype=np.float64), (n,))
+        fresh = np.ones(n, dtype=bool) if fresh is None else np.asarray(fresh, dtype=bool)
+        valid = np.asarray(valid, dtype=bool) & fresh
+        floor_y = self.floor_y
+
+        put(self.landmarks, landmarks, where=valid[:, None, None])  # lost poses may be NaN; keep them out
+        put(self.landmarks, 0, where=(fresh & ~valid)[:, None, None])
+        put(self.valid, valid, where=fresh)
+        put(self.ts, now, where=fresh)
+        put(self.gesture, NO_LABEL, where=fresh)
+        if frame_id is not None:
+            put(self.frame_id, frame_id, where=fresh)
+
+        # both wrists to pixels, [session, left/right, x/y]
+        lm = self.landmarks
+        size = np.stack([self.width, self.height], axis=1)
+        hands = (lm[:, (LEFT_WRIST, RIGHT_WRIST), :2] * size[:, None, :]).astype(np.int64)
+
+        # --- Hand speed (pixels per reference frame) ---
+        dt = now - self.prev_ts
+        frames = np.where(dt > 0, dt * PHYSICS_REF_FPS, 1.0)  # also 1.0 for the first frame (NaN)
+        put(self.prev_ts, now, where=fresh)
+        track = (valid & self.prev_valid)[:, None, None]
+        put(self.speed, (hands - self.prev_hands) / frames[:, None, None], where=track)
+        put(self.prev_hands, hands, where=valid[:, None, None])
+        put(self.prev_valid, valid, where=fresh)
+        (lsx, lsy), (rsx, rsy) = self.speed[:, 0].T, self.speed[:, 1].T
+        put(self.hand_v, self.hand_v + HAND_VELOCITY_SMOOTHING * (self.speed - self.hand_v), where=fresh[:, None, None])
+
+        # --- Unity joystick offset ---
+        if self.move.any():
+            put(self.ball_x, self.ball_x + self.move[:, 0] * 5 * frames, where=fresh)
+            put(self.ball_y, self.ball_y - self.move[:, 1] * 5 * frames, where=fresh)
+
+        # --- Hand interaction logic ---
+        put(self.ball_color, C_DEFAULT, where=fresh)
+        dl = np.hypot(hands[:, 0, 0] - self.ball_x, hands[:, 0, 1] - self.ball_y)
+        dr = np.hypot(hands[:, 1, 0] - self.ball_x, hands[:, 1, 1] - self.ball_y)
+        near_l, near_r = valid & (dl < cfg.HOLD_DIST), valid & (dr < cfg.HOLD_DIST)
+
+        grab = (near_l | near_r) & ~self.hit_cooldown
+        put(self.hold_start_time, now, where=grab & ~self.holding)
+        put(self.holding, True, where=grab)
+        put(self.hold_hand, np.where(near_l & near_r, BOTH, np.where(near_l, LEFT, RIGHT)), where=grab)
+        too_far = valid & ~grab & self.holding & (dl >= cfg.RELEASE_DIST) & (dr >= cfg.RELEASE_DIST)
+        self._release_downward(too_far, now)
+
+        held = valid & self.holding
+        hand = self.hold_hand
+        is_left, is_right, is_both = hand == LEFT, hand == RIGHT, hand == BOTH
+        carry = held & (is_left | is_right | is_both)
+        side = np.where(is_left, 0, 1)[:, None]
+        one_x = np.take_along_axis(hands[:, :, 0], side, 1)[:, 0]
+        one_y = np.take_along_axis(hands[:, :, 1], side, 1)[:, 0]
+        mid = (hands[:, 0] + hands[:, 1]) // 2
+        put(self.ball_x, np.where(is_both, mid[:, 0], one_x), where=carry)
+        put(self.ball_y, np.where(is_both, mid[:, 1], one_y), where=carry)
+        put(self.ball_vx, np.where(is_both, (lsx + rsx) / 2, np.where(is_left, lsx, rsx)), where=carry)
+
+        put(self.ball_color, C_HOLD, where=held)
+
+        on_floor = held & (self.ball_y >= floor_y - BALL_RADIUS * 0.2)
+        put(self.ball_y, floor_y, where=on_floor)
+
+        # --- Moves (gestures.MOVES): every feature once, then each move's conditions as masks ---
+        F = self.features
+        F[:, F_LEFT_DIST], F[:, F_RIGHT_DIST] = dl, dr
+        F[:, F_LEFT_VX], F[:, F_LEFT_VY], F[:, F_RIGHT_VX], F[:, F_RIGHT_VY] = lsx, lsy, rsx, rsy
+        y = lm[:, (NOSE, LEFT_WRIST, RIGHT_WRIST, LEFT_ELBOW, RIGHT_ELBOW), Y].astype(np.float64)
+        z = lm[:, (LEFT_WRIST, RIGHT_WRIST, LEFT_SHOULDER, RIGHT_SHOULDER), Z].astype(np.float64)
+        F[:, F_LEFT_DEPTH], F[:, F_RIGHT_DEPTH] = z[:, 0] - z[:, 2], z[:, 1] - z[:, 3]
+        F[:, F_HEAD_CLEARANCE] = y[:, 0] - np.maximum(y[:, 1], y[:, 2])
+        F[:, F_STRETCH] = np.maximum(np.abs(y[:, 1] - y[:, 3]), np.abs(y[:, 2] - y[:, 4]))
+        F[:, F_HAND_VX] = np.where(is_left, lsx, rsx)
+        F[:, F_HAND_VY] = np.where(is_left, lsy, rsy)
+        F[:, F_HAND_DEPTH] = np.where(is_left, F[:, F_LEFT_DEPTH], F[:, F_RIGHT_DEPTH])
+        F[:, F_HOLD_TIME] = now - self.hold_start_time
+        F[:, F_HEIGHT] = floor_y - self.ball_y
+
+        held_by = {LEFT: held & is_left, RIGHT: held & is_right, BOTH: held & is_both}
+        fired = np.zeros(n, dtype=bool)
+        releases = on_floor.copy()  # every release_ball_downward of this frame
+        labels, shots = [], []
+        for move, hands, conditions, code in self.moves:
+            mask = held_by[hands[0]]
+            for hand in hands[1:]:
+                mask = mask | held_by[hand]
+            mask = mask & ~fired  # first match wins
+            for i, op, value, use_abs in conditions:
+                if not mask.any():
+                    break
+                mask &= _COMPARE[op](np.abs(F[:, i]) if use_abs else F[:, i], value)
+            if not mask.any():
+                continue
+            fired |= mask
+            put(self.gesture, code, where=mask)
+            effect = move.effect
+            if isinstance(effect, Release):
+                releases |= mask
+                labels.append((mask, code))
+            elif isinstance(effect, Cross):
+                # the release right after keeps only vx (and side mode) from the cross itself
+                put(self.side_mode, True, where=mask)
+                put(self.side_mode_time, now if self.sim_time is None else self.sim_time, where=mask)  # physics clock
+                put(self.ball_vx, F[:, F_HAND_VX] * effect.kx, where=mask)
+                releases |= mask
+                labels.append((mask, code))
+            else:
+                shots.append((mask, effect.real, code))
+
+        self._release_downward(releases, now)
+        for mask, code in labels:
+            put(self.label, code, where=mask)
+        for mask, real, code in shots:
+            # shoot.shoot_real / shoot_fake
+            put(self.holding, not real, where=mask)
+            put(self.hit_cooldown, True, where=mask)
+            put(self.last_hit_time, now, where=mask)
+            put(self.ball_vy, DRIBBLE_FORCE * (-2.8 if real else -0.8), where=mask)
+            put(self.dribble_energy, DRIBBLE_FORCE * (1.2 if real else 0.4), where=mask)
+            put(self.ball_color, C_REAL_SHOT if real else C_FAKE_SHOT, where=mask)
+            put(self.label, code, where=mask)
+
+        cooled = valid & self.hit_cooldown & (now - self.last_hit_time > COOLDOWN)
+        put(self.hit_cooldown, False, where=cooled)
+
+        # no pose: nobody is holding the ball
+        lost = fresh & ~valid
+        put(self.holding, False, where=lost)
+        put(self.hold_hand, NO_HAND, where=lost)
+        put(self.dribble_energy, 0, where=lost)
+
+    # ---------- Physics ----------
+    def step(self, t):
+        """One fixed physics step, ending at simulation time t, for every session."""
+        self.prev_x[:], self.prev_y[:] = self.ball_x, self.ball_y
+        k = self.k
+        free = ~self.holding
+        x, y, vx, vy, energy = self.ball_x, self.ball_y, self.ball_vx, self.ball_vy, self.dribble_energy
+
+        assist = self.side_mode & (t - self.side_mode_time < SIDE_ASSIST_DURATION)
+        put(vy, vy + GRAVITY * k * np.where(assist, 0.4, 1.0), where=free)
+        put(self.side_mode, False, where=free & ~assist)
+        put(y, y + vy * k, where=free)
+        put(x, x + vx * k, where=free)
+        put(vx, vx * self.friction, where=free)
+
+        hit_l = free & (x - BALL_RADIUS < 0)
+        hit_r = free & ~hit_l & (x + BALL_RADIUS > self.width)
+        put(x, BALL_RADIUS, where=hit_l)
+        put(x, self.width - BALL_RADIUS, where=hit_r)
+        put(vx, vx * -0.6, where=hit_l | hit_r)
+
+        floor = free & (y >= self.floor_y)
+        put(y, self.floor_y, where=floor)
+        put(vy, vy * -ELASTICITY, where=floor)
+        settled = floor & (np.abs(vy) < 1)
+        kick = floor & ~settled & (energy > 0)
+        put(energy, 0, where=settled)
+        put(vy, vy - energy * 0.3, where=kick)
+        put(energy, energy * 0.7, where=kick)
+
+        self.cur_x[:], self.cur_y[:] = x, y
+
+    def advance(self, now):
+        """Run as many fixed steps as fit in the time since the last call (shared clock)."""
+        if self.sim_time is None:
+            self.sim_time = now
+            return
+        self.accumulator += now - self.sim_time
+        self.sim_time = now
+        steps = 0
+        while self.accumulator >= self.dt:
+            self.step(now - self.accumulator + self.dt)
+            self.accumulator -= self.dt
+            steps += 1
+            if steps == PHYSICS_MAX_STEPS:
+                self.accumulator = 0.0
+                break
+
+    def sample(self):
+        """Ball (x, y) arrays interpolated between the last two steps."""
+        alpha = self.accumulator / self.dt
+        x = self.prev_x + (self.cur_x - self.prev_x) * alpha
+        y = self.prev_y + (self.cur_y - self.prev_y) * alpha
+        return np.where(self.holding, self.ball_x, x), np.where(self.holding, self.ball_y, y)
+
+    # ---------- Output ----------
+    def action_codes(self):
+        """protocol action code of every session, (N,) uint8."""
+        return _ACTION_TABLE[self.label, self.holding.astype(np.int8), self.hold_hand]
+
+    def snapshot(self, i, ball=None):
+        """game_state.Snapshot for session i (ball: interpolated (x, y) from sample())."""
+        label, holding, hand = int(self.label[i]), bool(self.holding[i]), int(self.hold_hand[i])
+        x, y = ball if ball is not None else (float(self.ball_x[i]), float(self.ball_y[i]))
+        landmarks = self.landmarks[i].copy() if self.valid[i] else None
+        self.seq[i] += 1
+        ball_ts = float(self.ts[i])
+        if not holding and self.sim_time is not None:
+            ball_ts = self.sim_time - self.dt  # sample() is one step behind the clock
+        return Snapshot(
+            int(self.frame_id[i]), float(self.ts[i]),
+            x, y, float(self.ball_vx[i]), float(self.ball_vy[i]),
+            holding, HAND_NAMES[hand], LABELS[label], COLORS[self.ball_color[i]],
+            _action(label, holding, hand), True if "shot" in LABELS[label].lower() else None,
+            LazyKeypoints(landmarks), landmarks,
+            int(self.seq[i]), ball_ts, float(self.floor_y[i]),
+            tuple(self.hand_v[i].ravel().tolist()) if self.valid[i] else None,
+        )
@@ -0,0 +1,135 @@
+from collections import namedtuple
+
+import config
+from config import BALL_COLOR_DEFAULT
+from pose_stream import LazyKeypoints
+
+# Immutable per-tick view of the game for the network side.
+Snapshot = namedtuple(
+    "Snapshot",
+    "frame_id ts ball_x ball_y ball_vx ball_vy holding hold_hand last_label ball_color action shot_in keypoints landmarks"
+    " seq ball_ts floor_y hand_v",
+)
+# seq      publish counter, so clients can drop stale or repeated messages
+# ball_ts  time the ball position is for (physics time; the frame's ts while it is in a hand)
+# hand_v   filtered (left vx, vy, right vx, vy) in pixels per reference frame, or None
+
+# The config.py thresholds the gesture rules read. GameLogic and BatchGame take a GestureConfig
+# (default: config.py's values), so tune.py can try others without patching the module; in
+# BatchGame every field may also be an (N,) array, one value per session.
+GESTURE_PARAMS = (
+    "HOLD_DIST", "RELEASE_DIST", "SPEED_TWO_HANDS",
+    "DRIBBLE_SPEED_THRESHOLD", "CROSSOVER_SPEED_THRESHOLD", "CROSSOVER_HOLD_TIME", "CROSS_PREP_Y_IGNORE",
+    "MIN_HOLD_BEFORE_RELEASE",
+)
+GestureConfig = namedtuple("GestureConfig", GESTURE_PARAMS)
+
+
+def gesture_config(**overrides):
+    """config.py's gesture thresholds, with any of them replaced by keyword."""
+    unknown = set(overrides) - set(GESTURE_PARAMS)
+    if unknown:
+        raise ValueError(f"not gesture parameters: {', '.join(sorted(unknown))}")
+    return GestureConfig(*(overrides.get(name, getattr(config, name)) for name in GESTURE_PARAMS))
+
+
+def action_name(label):
+    """A label as a Unity-friendly action name: "Between Legs" -> "between_legs"."""
+    return label.lower().replace(" ", "_")
+
+
+def detect_action(state):
+    """Convert the current label or hand state into a Unity-friendly action name."""
+    if state.last_label:
+        return action_name(state.last_label)
+    if state.holding:
+        return f"holding_{state.hold_hand or 'auto'}"
+    return "dribbling"
+
+
+def detect_shot_result(state):
+    """
+    Decide if shot goes in or not.
+    - Return True when shooting and guaranteed to score (100% hit)
+    - Return None when not shooting
+    """
+    if "shot" in state.last_label.lower():
+        return True
+    return None
+
+
+class GameState:
+    """
+    Ball and player state, mutated in place by the CV side
+    (Player.run_cv_loop, dribble.py, shoot.py, physics.py).
+
+    Readers on other threads never look at these fields: they read
+    `snapshot`, which publish() replaces with a new immutable Snapshot
+    in a single reference assignment, so a reader always sees one
+    consistent tick without taking a lock.
+    """
+
+    __slots__ = (
+        "ball_x", "ball_y", "ball_vx", "ball_vy",
+        "dribble_energy",
+        "holding", "hold_hand",
+        "hold_start_time", "last_hit_time",
+        "hit_cooldown",
+        "side_mode", "side_mode_time",
+        "ball_color",
+        "last_label",
+        "frame_id", "ts", "keypoints", "landmarks",
+        "floor_y", "hand_v",
+        "seq", "snapshot",
+    )
+
+    def __init__(self):
+        self.ball_x, self.ball_y = 320, 200
+        self.ball_vx, self.ball_vy = 0, 0
+        self.dribble_energy = 0
+        self.holding, self.hold_hand = False, None
+        self.hold_start_time, self.last_hit_time = 0, 0
+        self.hit_cooldown = False
+        self.side_mode, self.side_mode_time = False, 0
+        self.ball_color = BALL_COLOR_DEFAULT
+        self.last_label = ""
+        self.frame_id, self.ts = -1, 0.0
+        self.landmarks = None  # (33, 4) array from the pose stage, or None
+        self.keypoints = LazyKeypoints(None)  # named-dict form, built only for JSON clients
+        self.floor_y = None
+        self.hand_v = None
+        self.seq = 0
+        self.publish(self.ball_x, self.ball_y)
+
+    def publish(self, ball_x, ball_y, ball_ts=None):
+        """
+        Swap in a snapshot of the current tick; ball_x/ball_y are the
+        (interpolated) position to show, ball_ts the time it is for
+        (default: the frame's capture time).
+        """
+        self.seq += 1
+        self.snapshot = Snapshot(
+            self.frame_id, self.ts,
+            ball_x, ball_y, self.ball_vx, self.ball_vy,
+            self.holding, self.hold_hand, self.last_label, self.ball_color,
+            detect_action(self), detect_shot_result(self),
+            self.keypoints, self.landmarks,
+            self.seq, self.ts if ball_ts is None else ball_ts, self.floor_y, self.hand_v,
+        )
+
+
+def snapshot_message(snap, predicted=None):
+    """The JSON message Unity expects, built from one snapshot (and an optional ball prediction)."""
+    message = {
+        "seq": snap.seq,
+        "frame_id": snap.frame_id,
+        "ts": snap.ts,
+        "ball_ts": snap.ball_ts,
+        "pose": snap.keypoints.to_dict(),
+        "action": snap.action,
+        "ball": {"x": snap.ball_x, "y": snap.ball_y, "vx": snap.ball_vx, "vy": snap.ball_vy},
+        "shot_in": snap.shot_in,
+    }
+    if predicted is not None:
+        message["predicted"] = {"x": predicted.x, "y": predicted.y, "t": predicted.t}
+    return message
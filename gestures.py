@@ -0,0 +1,199 @@
+"""
+Gesture rules for GameLogic, declared as data.
+
+Once per frame GameLogic fills one fixed feature vector (a flat list
+indexed by the F_* constants), all from the frame's own timestamp:
+
+    left_dist / right_dist     hand to ball, pixels (inf without a pose)
+    left_vx ... right_vy       hand speed, pixels per reference frame
+    left_depth / right_depth   wrist z minus shoulder z (> 0.1: hand behind the back)
+    head_clearance             nose y minus the lower wrist's y (> 0: both wrists above the head)
+    stretch                    the larger wrist-to-elbow height, normalized
+    hand_vx / hand_vy / hand_depth   the holding hand's speed and depth (one-hand holds)
+    hold_time                  seconds since the ball was caught
+    height                     floor y minus ball y, pixels
+
+A move is a name, the hold hands it applies to, a list of
+(feature, op, threshold) conditions that must all hold (ops: > < >= <=,
+and abs> abs< on the feature's magnitude; a threshold is a number or a
+GestureConfig field name) and an effect: Release (let the ball drop),
+Cross (throw it sideways, then release) or Shot (real or fake). The
+first move whose conditions all hold fires, and its name becomes the
+ball's label, so the clients see it as the action ("Between Legs" ->
+"between_legs").
+
+MOVES drives both engines. GestureDetector compiles it into one small
+function per hold hand with the thresholds inlined, for GameLogic;
+game_batch.BatchGame evaluates the same conditions as masks over all of
+its sessions, and LABELS (the gesture codes BatchGame and sessionlog.py
+store) and protocol.ACTIONS (the action codes on the wire, in recordings
+and in session logs) are built from the move names. So a new move, e.g.
+
+    Move("Spin", ONE_HAND, (("hold_time", ">", 0.3), ("hand_vx", "abs>", 12)), Cross(-1.5, 1.0, 0.4)),
+
+plays in main.py / main2.py, the court server and the tuner alike and
+reaches the clients as action "spin" (after `python protocol.py` has
+regenerated the Unity decoder's table). It only costs frames where the ball is held by a hand it applies to and
+every move before it has failed.
+"""
+import math
+from collections import namedtuple
+
+import numpy as np
+
+from config import DRIBBLE_FORCE
+from dribble import release_ball_downward
+from game_state import gesture_config
+from pose_stream import NOSE, LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_ELBOW, RIGHT_ELBOW, LEFT_WRIST, RIGHT_WRIST, Y, Z
+from shoot import shoot_fake, shoot_real
+from utils import dist
+
+FEATURES = (
+    "left_dist", "right_dist", "left_vx", "left_vy", "right_vx", "right_vy", "left_depth", "right_depth",
+    "head_clearance", "stretch", "hand_vx", "hand_vy", "hand_depth", "hold_time", "height",
+)
+(F_LEFT_DIST, F_RIGHT_DIST, F_LEFT_VX, F_LEFT_VY, F_RIGHT_VX, F_RIGHT_VY, F_LEFT_DEPTH, F_RIGHT_DEPTH,
+ F_HEAD_CLEARANCE, F_STRETCH, F_HAND_VX, F_HAND_VY, F_HAND_DEPTH, F_HOLD_TIME, F_HEIGHT) = range(len(FEATURES))
+
+# landmark rows read for the pose features, taken in one go per frame
+_ROWS = np.array((NOSE, LEFT_WRIST, RIGHT_WRIST, LEFT_ELBOW, RIGHT_ELBOW, LEFT_SHOULDER, RIGHT_SHOULDER))
+
+OPS = (">", "<", ">=", "<=", "abs>", "abs<")
+
+Move = namedtuple("Move", "name hands when effect")
+ONE_HAND, BOTH_HANDS = ("left", "right"), ("both",)
+
+
+# ---------- Effects ----------
+# apply() is GameLogic's version; game_batch.BatchGame has a vectorized one for each of these classes.
+# now is the frame's timestamp, sim_time the physics clock (later than now by the pipeline's latency
+# when live, the same in replay): anything BallPhysics.step compares with its own time uses sim_time.
+class Release:
+    """release_ball_downward, labelled with the move."""
+
+    def apply(self, state, now, f, name, sim_time):
+        release_ball_downward(state, now)
+        state.last_label = name
+
+
+class Cross:
+    """Side mode with the ball thrown at kx times the hand's x speed, then a release, labelled with the move."""
+
+    def __init__(self, kx, vy, energy):
+        self.kx, self.vy, self.energy = kx, vy, energy
+
+    def apply(self, state, now, f, name, sim_time):
+        state.side_mode, state.side_mode_time = True, sim_time  # the assist runs on the physics clock
+        state.ball_vx = f[F_HAND_VX] * self.kx
+        state.ball_vy, state.dribble_energy = DRIBBLE_FORCE * self.vy, DRIBBLE_FORCE * self.energy
+        release_ball_downward(state, now)
+        state.last_label = name  # reported as the move, not the release's "Dribble"
+
+
+class Shot:
+    """shoot_real / shoot_fake."""
+
+    def __init__(self, real):
+        self.real = real
+
+    def apply(self, state, now, f, name, sim_time):
+        (shoot_real if self.real else shoot_fake)(state, now)
+        state.last_label = name
+
+
+# ---------- Rules ----------
+_CROSS = (
+    ("hold_time", ">", "CROSSOVER_HOLD_TIME"),
+    ("hand_vx", "abs>", "CROSSOVER_SPEED_THRESHOLD"),
+    ("hand_vy", "abs<", "CROSS_PREP_Y_IGNORE"),
+)
+_SHOT = (("left_vy", "<", -35), ("right_vy", "<", -35))
+
+# in priority order
+MOVES = (
+    Move("Dribble (left)", ("left",),
+         (("hold_time", ">", "MIN_HOLD_BEFORE_RELEASE"), ("hand_vy", ">", "DRIBBLE_SPEED_THRESHOLD")), Release()),
+    Move("Dribble (right)", ("right",),
+         (("hold_time", ">", "MIN_HOLD_BEFORE_RELEASE"), ("hand_vy", ">", "DRIBBLE_SPEED_THRESHOLD")), Release()),
+    Move("Between Legs", ONE_HAND, _CROSS + (("height", "<", 150),), Cross(1.2, 1.6, 0.6)),
+    Move("Behind Back", ONE_HAND, _CROSS + (("hand_depth", ">", 0.1),), Cross(-0.8, 1.0, 0.4)),
+    Move("Cross", ONE_HAND, _CROSS, Cross(2.2, 0.8, 0.4)),
+    Move("Real Shot", BOTH_HANDS, _SHOT + (("head_clearance", ">", 0), ("stretch", ">", 0.15)), Shot(real=True)),
+    Move("Fake Shot", BOTH_HANDS, _SHOT, Shot(real=False)),
+    Move("Two-hand Dribble", BOTH_HANDS,
+         (("left_vy", ">", "SPEED_TWO_HANDS"), ("right_vy", ">", "SPEED_TWO_HANDS")), Release()),
+)
+
+# label / gesture codes: 0 is "none yet", 1 the plain release, then one per move
+LABELS = ("", "Dribble") + tuple(move.name for move in MOVES)
+if len(set(LABELS)) != len(LABELS):
+    raise ValueError(f"move names must be unique and not \"Dribble\": {LABELS[2:]}")
+
+def compile_conditions(move, config):
+    """[(feature index, op, threshold, abs)] of one move; thresholds are looked up in config (floats or arrays)."""
+    conditions = []
+    for feature, op, threshold in move.when:
+        if feature not in FEATURES or op not in OPS:
+            raise ValueError(f"{move.name}: bad condition {(feature, op, threshold)}")
+        value = getattr(config, threshold) if isinstance(threshold, str) else threshold
+        conditions.append((FEATURES.index(feature), op.removeprefix("abs"), value, op.startswith("abs")))
+    return conditions
+
+
+def compile_moves(moves, hand, config):
+    """Python source of match(f) for the moves that apply to `hand`: the first one whose conditions hold, or None."""
+    lines = ["def match(f):"]
+    for k, move in enumerate(moves):
+        if hand not in move.hands:
+            continue
+        tests = [
+            f"{f'abs(f[{i}])' if use_abs else f'f[{i}]'} {op} {float(value)!r}"
+            for i, op, value, use_abs in compile_conditions(move, config)
+        ]
+        lines.append(f"    if {' and '.join(tests) or 'True'}:")
+        lines.append(f"        return MOVES[{k}]")
+    lines.append("    return None")
+    return "\n".join(lines)
+
+class GestureDetector:
+    """The feature vector and the compiled MOVES for one player."""
+
+    def __init__(self, config=None, moves=MOVES):
+        config = config or gesture_config()
+        self.f = [0.0] * len(FEATURES)
+        self.source = {}
+        self.match = {}  # hold hand -> match(f)
+        for hand in ONE_HAND + BOTH_HANDS:
+            self.source[hand] = compile_moves(moves, hand, config)
+            scope = {"MOVES": moves}
+            exec(self.source[hand], scope)
+            self.match[hand] = scope["match"]
+
+    def measure(self, lm, left, right, speeds, ball):
+        """Frame features: lm (33, 4) or None, wrists in pixels, (lvx, lvy, rvx, rvy), ball (x, y)."""
+        f = self.f
+        f[F_LEFT_DIST] = dist(left, ball) if left else math.inf
+        f[F_RIGHT_DIST] = dist(right, ball) if right else math.inf
+        f[F_LEFT_VX], f[F_LEFT_VY], f[F_RIGHT_VX], f[F_RIGHT_VY] = speeds
+        if lm is not None:
+            (nose, _), (lw, lwz), (rw, rwz), (le, _), (re, _), (_, lsz), (_, rsz) = lm.take(_ROWS, 0)[:, Y:Z + 1].tolist()
+            f[F_LEFT_DEPTH], f[F_RIGHT_DEPTH] = lwz - lsz, rwz - rsz
+            f[F_HEAD_CLEARANCE] = nose - max(lw, rw)
+            f[F_STRETCH] = max(abs(lw - le), abs(rw - re))
+        else:
+            f[F_LEFT_DEPTH] = f[F_RIGHT_DEPTH] = f[F_HEAD_CLEARANCE] = f[F_STRETCH] = 0.0
+        return f
+
+    def detect(self, state, now):
+        """The move that fires for the ball held in state.hold_hand (its effect not applied yet), or None."""
+        match = self.match.get(state.hold_hand)
+        if match is None:
+            return None
+        f = self.f
+        if state.hold_hand == "left":
+            f[F_HAND_VX], f[F_HAND_VY], f[F_HAND_DEPTH] = f[F_LEFT_VX], f[F_LEFT_VY], f[F_LEFT_DEPTH]
+        elif state.hold_hand == "right":
+            f[F_HAND_VX], f[F_HAND_VY], f[F_HAND_DEPTH] = f[F_RIGHT_VX], f[F_RIGHT_VY], f[F_RIGHT_DEPTH]
+        f[F_HOLD_TIME] = now - state.hold_start_time
+        f[F_HEIGHT] = state.floor_y - state.ball_y
+        return match(f)
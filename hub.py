@@ -0,0 +1,186 @@
+import asyncio
+import json
+import time
+from collections import deque
+from urllib.parse import parse_qs, urlsplit
+
+import websockets
+
+from config import HUB_HEARTBEAT, HUB_MAX_RATE, HUB_CLIENT_MAX_RATE, PREDICT, PREDICT_CLIENT_DELAY
+from prediction import predict
+from protocol import encoder_for
+from telemetry import telemetry
+
+
+def _requested_rate(websocket):
+    """Per-client cap from the connection URL, e.g. ws://host:8765/?rate=10 for a spectator screen."""
+    request = getattr(websocket, "request", None)
+    path = request.path if request is not None else getattr(websocket, "path", "")
+    try:
+        rate = float(parse_qs(urlsplit(path).query)["rate"][0])
+    except (KeyError, ValueError):
+        return HUB_CLIENT_MAX_RATE
+    return min(max(rate, 1.0), HUB_CLIENT_MAX_RATE)
+
+
+class Subscriber:
+    """One connected client with a latest-only mailbox."""
+
+    __slots__ = (
+        "websocket", "encode", "min_interval",
+        "message", "message_ts", "offered", "control", "ready",
+        "last_sent", "last_ts", "sent", "dropped",
+    )
+
+    def __init__(self, websocket, encode, rate):
+        self.websocket = websocket
+        self.encode = encode
+        self.min_interval = 1.0 / rate
+        self.message = None
+        self.message_ts = 0.0  # capture time of the frame behind `message`
+        self.offered = 0.0     # perf_counter() when `message` was offered
+        self.control = deque()  # posted messages, all delivered in order ahead of snapshots
+        self.ready = asyncio.Event()
+        self.last_sent = 0.0
+        self.last_ts = 0.0
+        self.sent = self.dropped = 0
+
+    def offer(self, payload, ts):
+        if self.message is not None:
+            self.dropped += 1  # client hasn't taken the previous one yet; it is stale now
+            telemetry.count("stale")
+        self.message, self.message_ts = payload, ts
+        self.offered = time.perf_counter()
+        self.ready.set()
+
+    def post(self, payload):
+        self.control.append(payload)
+        self.ready.set()
+
+
+class BroadcastHub:
+    """
+    Fan-out of published GameState snapshots to every connected client.
+
+    The CV side calls notify() after publishing; the hub wakes, encodes the
+    snapshot once per wire format in use and drops it into each client's
+    mailbox. Each client has its own sender task, so a slow client only
+    loses stale frames and never delays the others. When nothing new is
+    published for HUB_HEARTBEAT seconds the last snapshot is re-sent.
+
+    post() sends occasional control messages (e.g. the quality level)
+    that every client must see, now and on connect; they are never
+    dropped or rate limited. A client that connects later gets the latest
+    one of each type, with its "now" (if any) set to the time of sending.
+
+    With PREDICT on, each broadcast carries the ball predicted for when
+    the client will show it: now, plus the measured mailbox-to-sent delay,
+    plus PREDICT_CLIENT_DELAY.
+
+    Encode and send times, camera-to-wire latency and stale (replaced
+    before sending) messages go to telemetry.
+    """
+
+    def __init__(self, state):
+        self.state = state
+        self.subscribers = set()
+        self._loop = None
+        self._wake = None
+        self._pending = False
+        self._task = None
+        self._posted = {}  # latest posted message per "type", replayed to new clients
+        self.delay = 0.0   # smoothed seconds from offer() to a finished send
+
+    def start(self):
+        """Start the broadcast task; call from inside the running event loop."""
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    def notify(self):
+        """A new snapshot was published. Safe to call from any thread, cheap to call often."""
+        if self._pending or self._loop is None:
+            return
+        self._pending = True
+        self._loop.call_soon_threadsafe(self._wake.set)
+
+    def post(self, message):
+        """Send a JSON control message (a dict with a "type") to every client. Safe from any thread."""
+        payload = json.dumps(message)
+        self._posted[message["type"]] = message
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._post, payload)
+
+    def _post(self, payload):
+        for sub in self.subscribers:
+            sub.post(payload)
+
+    async def _run(self):
+        last_snap = None
+        min_interval = 1.0 / HUB_MAX_RATE
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), HUB_HEARTBEAT)
+                heartbeat = False
+            except asyncio.TimeoutError:
+                heartbeat = True
+            self._wake.clear()
+            self._pending = False
+
+            snap = self.state.snapshot
+            if (snap is not last_snap or heartbeat) and self.subscribers:
+                self._broadcast(snap)
+            last_snap = snap
+            await asyncio.sleep(min_interval)  # coalesce bursts of publishes (physics ticks faster than this)
+
+    def _broadcast(self, snap):
+        predicted = None
+        if PREDICT:
+            predicted = predict(snap, time.time() + self.delay + PREDICT_CLIENT_DELAY)
+        payloads = {}  # encode once per wire format, not once per client
+        for sub in self.subscribers:
+            payload = payloads.get(sub.encode)
+            if payload is None:
+                t0 = time.perf_counter()
+                payload = payloads[sub.encode] = sub.encode(snap, predicted)
+                telemetry.record("encode", time.perf_counter() - t0)
+            sub.offer(payload, snap.ts)
+
+    async def serve(self, websocket):
+        """Send snapshots to one client until it disconnects."""
+        sub = Subscriber(websocket, encoder_for(websocket.subprotocol), _requested_rate(websocket))
+        self.subscribers.add(sub)
+        snap = self.state.snapshot
+        for message in list(self._posted.values()):
+            if "now" in message:
+                message = dict(message, now=time.time())  # e.g. a trajectory: the client syncs its clock to it
+            sub.control.append(json.dumps(message))
+        sub.offer(sub.encode(snap), snap.ts)  # don't make a new client wait for the next frame
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                await sub.ready.wait()
+                sub.ready.clear()
+                while sub.control:
+                    await websocket.send(sub.control.popleft())
+                wait = sub.last_sent + sub.min_interval - loop.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)  # newer frames may replace the mailbox meanwhile
+                payload, ts, sub.message = sub.message, sub.message_ts, None
+                if payload is None:
+                    continue
+                t0 = time.perf_counter()
+                await websocket.send(payload)
+                t1 = time.perf_counter()
+                telemetry.record("send", t1 - t0)
+                self.delay += 0.1 * (t1 - sub.offered - self.delay)
+                if ts != sub.last_ts and ts > 0:
+                    # first time this client gets this camera frame (physics ticks reuse its ts)
+                    telemetry.record("camera_to_wire", time.time() - ts)
+                    sub.last_ts = ts
+                sub.last_sent = loop.time()
+                sub.sent += 1
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self.subscribers.discard(sub)
@@ -0,0 +1,63 @@
+"""
+Unity joystick / keyboard input.
+
+Unity may send input every rendered frame, far faster than the game
+uses it. parse_message() turns one websocket message (the JSON "input"
+message or the binary INPUT struct from protocol.py) into a tuple, and
+InputMailbox keeps only the newest one: offer() from the event loop is a
+single reference swap, and tick(), called at the start of every physics
+tick, applies it once if it changed. Everything in between is
+coalesced (counted as "input_coalesced" in telemetry).
+"""
+import json
+
+from protocol import INPUT, INPUT_TAG
+from telemetry import telemetry
+
+INPUT_FIELDS = ("move_x", "move_y", "offset_x", "offset_z")
+
+
+def parse_message(message):
+    """(type, data) for one client message; data is the input tuple for "input". (None, None) if unreadable."""
+    if isinstance(message, bytes):
+        if len(message) == INPUT.size and message[0] == INPUT_TAG:
+            return "input", INPUT.unpack(message)[1:]
+        return None, None
+    try:
+        data = json.loads(message)
+    except ValueError:
+        return None, None
+    if not isinstance(data, dict):
+        return None, None
+    kind = data.get("type")
+    if kind == "input":
+        try:
+            return kind, tuple(float(data.get(name, 0)) for name in INPUT_FIELDS)
+        except (TypeError, ValueError):
+            return None, None
+    return kind, data
+
+
+class InputMailbox:
+    """Latest-value input slot; apply(values) runs on the physics thread, once per changed tick."""
+
+    def __init__(self, apply):
+        self._apply = apply
+        self._latest = None
+        self._applied = None
+        self._offered = 0
+
+    def offer(self, values):
+        """Called for every received input message; never blocks."""
+        self._latest = values
+        self._offered += 1
+
+    def tick(self):
+        latest = self._latest
+        if latest is self._applied:
+            return
+        self._applied = latest
+        if self._offered > 1:
+            telemetry.count("input_coalesced", self._offered - 1)
+        self._offered = 0
+        self._apply(latest)
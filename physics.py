@@ -0,0 +1,152 @@
+import threading
+import time
+
+from config import (
+    BALL_RADIUS, ELASTICITY, FRICTION, GRAVITY, SIDE_ASSIST_DURATION,
+    PHYSICS_HZ, PHYSICS_MAX_STEPS, PHYSICS_REF_FPS,
+)
+
+
+def ref_frames(dt):
+    """How many reference frames (1 / PHYSICS_REF_FPS s, the rate config.py was tuned at) dt spans."""
+    return dt * PHYSICS_REF_FPS if dt > 0 else 1.0
+
+
+class BallPhysics:
+    """
+    Fixed-timestep ball integrator that ticks on its own thread.
+
+    Velocities stay in the original units (pixels per reference frame), so
+    GRAVITY / FRICTION / DRIBBLE_FORCE and the speed thresholds mean the same
+    thing whatever rate the camera or pose model runs at; each substep just
+    advances a fraction of a reference frame.
+
+    The gesture code keeps writing ball_* fields into the GameState, but
+    must do so while holding `lock`. Every tick that moved the ball ends
+    with a published snapshot for the network side.
+    """
+
+    def __init__(self, state, hz=PHYSICS_HZ, clock=time.time):
+        self.state = state
+        self.clock = clock  # same clock as the frame timestamps; replay passes its own
+        self.dt = 1.0 / hz
+        self.k = PHYSICS_REF_FPS * self.dt   # reference frames per step
+        self.friction = FRICTION ** self.k   # same decay per second as FRICTION per frame
+        self.lock = threading.RLock()
+
+        self.width = self.floor_y = None     # known once the first frame arrives
+        self.sim_time = None
+        self.accumulator = 0.0
+        self.prev = self.cur = (state.ball_x, state.ball_y)
+
+        self.on_publish = None  # called after every published snapshot (e.g. BroadcastHub.notify)
+        self.on_tick = None     # called under the lock at the start of every tick (e.g. InputMailbox.tick)
+        self.flight = None      # trajectory.FlightTracker: skips publishing ticks that follow a sent flight
+
+        self._thread = None
+        self._stop = threading.Event()
+
+    def set_bounds(self, width, floor_y):
+        self.width, self.floor_y = width, floor_y
+
+    # ---------- Integration ----------
+    def step(self, t):
+        """Advance one fixed step ending at simulation time t."""
+        s, k = self.state, self.k
+        self.prev = (s.ball_x, s.ball_y)
+        if s.holding:
+            self.cur = self.prev
+            return
+
+        if s.side_mode and t - s.side_mode_time < SIDE_ASSIST_DURATION:
+            s.ball_vy += GRAVITY * 0.4 * k
+        else:
+            s.ball_vy += GRAVITY * k
+            s.side_mode = False
+        s.ball_y += s.ball_vy * k
+        s.ball_x += s.ball_vx * k
+        s.ball_vx *= self.friction
+
+        if s.ball_x - BALL_RADIUS < 0:
+            s.ball_x, s.ball_vx = BALL_RADIUS, -s.ball_vx * 0.6
+        elif s.ball_x + BALL_RADIUS > self.width:
+            s.ball_x, s.ball_vx = self.width - BALL_RADIUS, -s.ball_vx * 0.6
+
+        if s.ball_y >= self.floor_y:
+            s.ball_y = self.floor_y
+            s.ball_vy = -s.ball_vy * ELASTICITY
+            if abs(s.ball_vy) < 1:
+                s.dribble_energy = 0
+            elif s.dribble_energy > 0:
+                s.ball_vy -= s.dribble_energy * 0.3
+                s.dribble_energy *= 0.7
+
+        self.cur = (s.ball_x, s.ball_y)
+
+    def advance(self, now):
+        """Run as many fixed steps as fit in the time since the last call."""
+        with self.lock:
+            if self.on_tick is not None:
+                self.on_tick()
+            if self.sim_time is None or self.floor_y is None:
+                self.sim_time = now
+                return
+            if self.flight is not None:
+                self.flight.tick(self.sim_time - self.accumulator)  # time of the current position
+            self.accumulator += now - self.sim_time
+            self.sim_time = now
+            steps = 0
+            while self.accumulator >= self.dt:
+                self.step(now - self.accumulator + self.dt)
+                self.accumulator -= self.dt
+                steps += 1
+                if steps == PHYSICS_MAX_STEPS:
+                    self.accumulator = 0.0  # fell too far behind; drop the backlog
+                    break
+            if steps and self._moved():
+                if self.flight is None or not self.flight.on_track(now - self.accumulator):
+                    self.publish()
+
+    def sample(self):
+        """Ball (x, y, vx, vy) interpolated between the last two steps."""
+        with self.lock:
+            s = self.state
+            if s.holding:
+                return s.ball_x, s.ball_y, s.ball_vx, s.ball_vy
+            alpha = self.accumulator / self.dt
+            (px, py), (cx, cy) = self.prev, self.cur
+            return px + (cx - px) * alpha, py + (cy - py) * alpha, s.ball_vx, s.ball_vy
+
+    def _moved(self):
+        """Skip publishing ticks where the ball is at rest (in hand or settled on the floor)."""
+        snap = self.state.snapshot
+        x, y, _, _ = self.sample()
+        return abs(x - snap.ball_x) + abs(y - snap.ball_y) > 0.05
+
+    def publish(self):
+        """Publish a GameState snapshot with the interpolated ball position."""
+        with self.lock:
+            x, y, _, _ = self.sample()
+            ball_ts = None
+            if not self.state.holding and self.sim_time is not None:
+                ball_ts = self.sim_time - self.dt  # sample() interpolates one step behind the clock
+            self.state.publish(x, y, ball_ts)
+        if self.on_publish is not None:
+            self.on_publish()
+
+    # ---------- Ticker thread ----------
+    def _run(self):
+        while not self._stop.is_set():
+            self.advance(self.clock())
+            self._stop.wait(self.dt)
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="physics", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
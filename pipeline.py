@@ -0,0 +1,160 @@
+import threading
+import time
+from collections import deque
+
+from config import PIPELINE_QUEUE_SIZE
+from telemetry import telemetry
+
+
+class LatestQueue:
+    """
+    Bounded hand-off between two stages.
+    When full, put() throws away the oldest item so the consumer
+    always works on the newest frame (latest-frame-wins).
+    """
+
+    def __init__(self, maxsize=PIPELINE_QUEUE_SIZE):
+        self._items = deque(maxlen=maxsize)
+        self._cond = threading.Condition()
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Return the next item, or None once the queue is closed and drained."""
+        with self._cond:
+            while not self._items:
+                if self._closed:
+                    return None
+                if not self._cond.wait(timeout):
+                    return None
+            return self._items.popleft()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class FramePacket:
+    """One camera frame travelling through the pipeline."""
+
+    __slots__ = ("frame_id", "ts", "frame", "width", "height", "landmarks", "ball")
+
+    def __init__(self, frame_id, ts, frame):
+        self.frame_id = frame_id
+        self.ts = ts  # capture time (time.time()), used as "now" by the game logic
+        self.frame = frame
+        self.height, self.width = frame.shape[:2]
+        self.landmarks = None  # (33, 4) pose array, filled by the inference stage
+        self.ball = None       # (x, y, color) snapshot, filled by the logic stage
+
+
+# ---------- Stages ----------
+def _capture_stage(cap, out_q, stop, flip):
+    frame_id = 0
+    try:
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            ok, frame = cap.read()
+            if not ok:
+                break
+            ts = time.time()
+            telemetry.record("capture", time.perf_counter() - t0)
+            if flip is not None:
+                frame = flip(frame)
+            out_q.put(FramePacket(frame_id, ts, frame))
+            frame_id += 1
+    finally:
+        stop.set()
+        out_q.close()
+
+
+def _worker_stage(fn, in_q, out_q, stop, name):
+    try:
+        while True:
+            packet = in_q.get()
+            if packet is None:
+                break
+            t0 = time.perf_counter()
+            if fn(packet) is False:
+                continue  # the stage skipped this frame; it goes no further
+            telemetry.record(name, time.perf_counter() - t0)
+            if out_q is not None:
+                out_q.put(packet)
+    finally:
+        stop.set()
+        if out_q is not None:
+            out_q.close()
+
+
+def _display_stage(draw, in_q, stop, min_interval):
+    try:
+        while True:
+            packet = in_q.get()
+            if packet is None:
+                break
+            t0 = time.perf_counter()
+            keep_going = draw(packet)
+            telemetry.record("display", time.perf_counter() - t0)
+            if keep_going is False:
+                break
+            if min_interval:
+                # throttled preview: frames arriving meanwhile replace each other in the queue
+                stop.wait(t0 + min_interval - time.perf_counter())
+    finally:
+        stop.set()
+
+
+def run_pipeline(cap, infer, update, draw=None, flip=None, draw_fps=None, stop=None):
+    """
+    Run capture -> inference -> game logic -> (optional) display as
+    separate threads joined by LatestQueues, so the stages overlap and
+    throughput is set by the slowest stage only.
+
+    Each stage's time per frame goes to telemetry under the stage name,
+    and frames thrown away by a full queue are counted as dropped_<queue>.
+
+    infer(packet)  fills packet.landmarks; return False to skip the frame
+    update(packet) runs gesture/physics logic using packet.ts as the clock
+    draw(packet)   renders the frame; return False to stop the pipeline
+                   (None: headless, no display stage at all)
+
+    draw_fps caps how often draw runs (a cheap debug preview); `stop` is an
+    optional threading.Event another thread can set to shut the pipeline down.
+    """
+    stop = stop if stop is not None else threading.Event()
+    captured, inferred = LatestQueue(), LatestQueue()
+    updated = LatestQueue() if draw is not None else None
+
+    threads = [
+        threading.Thread(target=_capture_stage, args=(cap, captured, stop, flip), name="capture"),
+        threading.Thread(target=_worker_stage, args=(infer, captured, inferred, stop, "inference"), name="inference"),
+        threading.Thread(target=_worker_stage, args=(update, inferred, updated, stop, "logic"), name="logic"),
+    ]
+    if draw is not None:
+        min_interval = 1.0 / draw_fps if draw_fps else 0
+        threads.append(threading.Thread(target=_display_stage, args=(draw, updated, stop, min_interval), name="display"))
+
+    telemetry.gauge("dropped_capture", lambda: captured.dropped)    # inference couldn't keep up
+    telemetry.gauge("dropped_inference", lambda: inferred.dropped)  # logic couldn't keep up
+    if updated is not None:
+        telemetry.gauge("dropped_display", lambda: updated.dropped)
+
+    for t in threads:
+        t.daemon = True
+        t.start()
+    try:
+        while any(t.is_alive() for t in threads):
+            threads[-1].join(0.1)
+    finally:
+        stop.set()
+        for q in (captured, inferred, updated):
+            if q is not None:
+                q.close()
@@ -0,0 +1,205 @@
+from startup import Startup  # first: its clock times the imports below
+from utils import *
+from pose_stream import draw_pose
+from pose_worker import open_pose
+from pipeline import run_pipeline
+from physics import BallPhysics
+from game import GameLogic
+from recorder import Recorder
+from sessionlog import SessionLog
+from game_state import GameState
+from protocol import select_subprotocol
+from hub import BroadcastHub
+from telemetry import serve_stats
+from inputs import parse_message
+from ratelog import log
+from quality import QualityController, scale
+from roi import RoiTracker
+from tracking import KeypointTracker
+from trajectory import FlightTracker
+from video import VideoFeed, is_video_request
+import signal, threading
+import asyncio, websockets
+import cv2
+
+
+def open_camera():
+    cap = cv2.VideoCapture(0)
+    if not cap.isOpened():
+        raise RuntimeError("camera 0 could not be opened")
+    return cap
+
+
+class Player:
+    """
+    One player in front of the local camera, served over ws://localhost:8765.
+
+    Everything main.py and main2.py have in common: game state, ball
+    physics, the broadcast hub, the camera -> pose -> gesture -> preview
+    pipeline and the websocket server. An entry point only adds its own
+    transport: unity_input (joystick / WASD offsets read by the game
+    logic), on_tick (called at the start of every physics tick) and
+    on_input (called with the tuple of every "input" message).
+    """
+
+    def __init__(self, unity_input=None, on_tick=None, on_input=None):
+        self.on_input = on_input
+
+        # --- Ball and player state ---
+        self.state = GameState()
+
+        # fixed-timestep ball physics, ticking on its own thread
+        self.physics = BallPhysics(self.state)
+        if on_tick is not None:
+            self.physics.on_tick = on_tick
+
+        # every published snapshot is encoded once and fanned out to all connected clients
+        self.hub = BroadcastHub(self.state)
+        self.physics.on_publish = self.hub.notify
+
+        # a free ball's flight goes out once as a parametric trajectory instead of tick by tick
+        if TRAJECTORIES:
+            self.physics.flight = FlightTracker(self.physics, self.hub.post)
+
+        # the camera feed as JPEG for clients on VIDEO_PATH, encoded off the pipeline threads
+        self.video = VideoFeed() if VIDEO_ENABLED else None
+
+        # time-to-first-frame and the "warming" / "live" status for the clients
+        self.startup = Startup(post=self.hub.post)
+        self.startup.mark("imports")
+
+        # steps pose model / input size / frame skipping / overlay to hold TARGET_FPS; decisions go to the clients
+        self.quality = QualityController(on_report=self.hub.post)
+
+        # set by Ctrl+C / SIGTERM or a {"type": "shutdown"} websocket message; stops the camera loop and the server
+        self.shutdown = threading.Event()
+
+        # hand / ball gesture logic, shared with headless replay (recorder.py)
+        self.logic = GameLogic(self.state, self.physics, unity_input)
+
+    # ---------- Main CV loop ----------
+    def run_cv_loop(self):
+        startup, quality, logic, video = self.startup, self.quality, self.logic, self.video
+
+        # opened here, not at import: the "process" inference mode re-imports the main module in the worker
+        # camera and pose model open side by side, while the server already tells clients "warming"
+        try:
+            cap, pose = startup.open(
+                open_camera,
+                lambda: open_pose(INFERENCE_MODE, min_detection_confidence=0.5, min_tracking_confidence=0.5),
+            )
+        except RuntimeError as e:
+            print(e)
+            return
+        startup.warm_up(pose, cap)
+
+        recorder = Recorder(RECORD_PATH) if RECORD_PATH else None
+        session_log = SessionLog() if SESSION_LOG_DIR else None
+
+        # crops inference input to the player (ROI_ENABLED); landmarks come back in full-frame coordinates
+        roi = RoiTracker()
+
+        # moves wrists / elbows / nose on frames without inference (INFERENCE_EVERY, quality skip)
+        tracker = KeypointTracker()
+
+        def infer(packet):
+            level = quality.level
+            if not quality.wants(packet.frame_id):
+                if not tracker.enabled:
+                    return False  # dropped; physics keeps the ball moving
+                packet.landmarks = tracker.track(packet.frame, packet.ts)
+                return
+            if level.model_complexity != pose.model_complexity:
+                pose.configure(model_complexity=level.model_complexity)
+            t0 = time.perf_counter()
+            image, box = roi.crop(packet.frame)
+            packet.landmarks = roi.track(pose.process(scale(image, level.downscale), packet.frame_id), box)
+            quality.observe(time.perf_counter() - t0, pose.model_complexity)
+            tracker.reset(packet.frame, packet.landmarks, packet.ts)
+
+        def update(packet):
+            snap = logic.update(packet.frame_id, packet.ts, packet.landmarks, packet.width, packet.height)
+            packet.ball = (int(snap.ball_x), int(snap.ball_y), snap.ball_color)
+            if recorder is not None:
+                recorder.write(packet.frame_id, packet.ts, packet.width, packet.height, packet.landmarks, snap.action)
+            if session_log is not None:
+                session_log.write(snap, logic.gesture)
+            if video is not None:
+                video.offer(packet.frame)  # a reference only; the encoder thread scales and compresses
+            startup.frame()
+
+        def draw(packet):
+            frame = packet.frame
+            if video is not None:
+                video.release(frame)  # the overlay below draws into the buffer the video may be reading
+            tracker.release(frame, keep=not quality.wants(packet.frame_id + 1))  # ... and the tracker may read next
+            if packet.landmarks is not None and quality.level.overlay:
+                draw_pose(frame, packet.landmarks)
+            bx, by, color = packet.ball
+            cv2.circle(frame, (bx, by), BALL_RADIUS, color, -1)
+            cv2.imshow("Basketball", frame)
+            if cv2.waitKey(1) & 0xFF == 27 and not HEADLESS:  # a headless preview doesn't own shutdown
+                return False
+
+        # headless: no overlay or window work at all, unless a throttled debug preview is asked for
+        show = not HEADLESS or PREVIEW_FPS > 0
+
+        # capture, inference, game logic and display run as overlapping stages
+        self.physics.start()
+        run_pipeline(
+            cap, infer, update, draw if show else None,
+            flip=lambda f: cv2.flip(f, 1),
+            draw_fps=PREVIEW_FPS if HEADLESS else None,
+            stop=self.shutdown,
+        )
+        self.physics.stop()
+
+        cap.release()
+        pose.close()
+        if recorder is not None:
+            recorder.close()
+        if session_log is not None:
+            session_log.close()
+        if show:
+            cv2.destroyAllWindows()
+
+    # ---------- WebSocket handler ----------
+    async def handle(self, websocket):
+        if self.video is not None and is_video_request(websocket):
+            await self.video.serve(websocket)
+            return
+        print("Unity connected to Python WebSocket")
+
+        # ball + pose data goes out through the hub whenever a new frame is published
+        send_task = asyncio.create_task(self.hub.serve(websocket))
+
+        try:
+            async for message in websocket:
+                kind, data = parse_message(message)  # (None, None) for anything unreadable
+                if kind == "input" and self.on_input is not None:
+                    self.on_input(data)
+                elif kind == "shutdown":
+                    print("Shutdown requested by client")
+                    self.shutdown.set()
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            send_task.cancel()
+        print("Unity disconnected")
+
+    # ---------- Run both CV + WebSocket together ----------
+    async def run(self):
+        server = await websockets.serve(self.handle, "localhost", 8765, select_subprotocol=select_subprotocol)
+        print("WebSocket server started at ws://localhost:8765")
+        self.hub.start()
+        if self.video is not None:
+            self.video.start()
+        self.startup.mark("server")
+        self.startup.status("warming")  # until the camera and the model are up
+        await serve_stats()  # per-stage latency on localhost:STATS_PORT and in the log
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: self.shutdown.set())
+        await asyncio.to_thread(self.run_cv_loop)  # runs until ESC, a signal or a shutdown message
+        server.close()
+        await server.wait_closed()
+        log.flush()  # lines still queued for the daemon log thread
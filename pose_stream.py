@@ -1,21 +1,80 @@
-from utils import *
+import time
 
-mp_pose = mp.solutions.pose
-def extract_keypoints(res):
+import numpy as np
+
+from telemetry import telemetry
+
+# --- Landmark indices (MediaPipe Pose order) and array columns ---
+NOSE = 0
+LEFT_SHOULDER, RIGHT_SHOULDER = 11, 12
+LEFT_ELBOW, RIGHT_ELBOW = 13, 14
+LEFT_WRIST, RIGHT_WRIST = 15, 16
+NUM_LANDMARKS = 33
+X, Y, Z, VIS = 0, 1, 2, 3
+
+# mp.solutions.pose.PoseLandmark names, spelled out so this module doesn't import mediapipe
+KEYPOINT_NAMES = (
+    "NOSE", "LEFT_EYE_INNER", "LEFT_EYE", "LEFT_EYE_OUTER", "RIGHT_EYE_INNER", "RIGHT_EYE", "RIGHT_EYE_OUTER",
+    "LEFT_EAR", "RIGHT_EAR", "MOUTH_LEFT", "MOUTH_RIGHT",
+    "LEFT_SHOULDER", "RIGHT_SHOULDER", "LEFT_ELBOW", "RIGHT_ELBOW", "LEFT_WRIST", "RIGHT_WRIST",
+    "LEFT_PINKY", "RIGHT_PINKY", "LEFT_INDEX", "RIGHT_INDEX", "LEFT_THUMB", "RIGHT_THUMB",
+    "LEFT_HIP", "RIGHT_HIP", "LEFT_KNEE", "RIGHT_KNEE", "LEFT_ANKLE", "RIGHT_ANKLE",
+    "LEFT_HEEL", "RIGHT_HEEL", "LEFT_FOOT_INDEX", "RIGHT_FOOT_INDEX",
+)
+
+
+def landmarks_array(res):
     """
-    Convert MediaPipe result to dict of named keypoints.
-    Call this from main.py with res = pose.process(...)
+    Convert MediaPipe result to a (33, 4) float32 array of x, y, z, visibility.
+    Returns None when no pose was found.
     """
-    keypoints = {}
     if not res or not res.pose_landmarks:
-        return keypoints
+        return None
+    lms = res.pose_landmarks.landmark
+    values = (v for lm in lms for v in (lm.x, lm.y, lm.z, lm.visibility))
+    return np.fromiter(values, dtype=np.float32, count=len(lms) * 4).reshape(-1, 4)
+
+
+def extract_keypoints(landmarks):
+    """
+    Convert a landmarks array to dict of named keypoints (x, y, z rounded to 4 places).
+    Only JSON clients need this form; see LazyKeypoints.
+    """
+    if landmarks is None:
+        return {}
+    rounded = np.round(landmarks[:, :3].astype(np.float64), 4).tolist()
+    return {name: {"x": x, "y": y, "z": z} for name, (x, y, z) in zip(KEYPOINT_NAMES, rounded)}
+
+
+class LazyKeypoints:
+    """
+    Named-dict view of one frame's landmarks array.
+    The dict is built on the first to_dict() call and then reused, so frames
+    that only go to binary clients never pay for it.
+    """
+
+    __slots__ = ("landmarks", "_dict")
+
+    def __init__(self, landmarks):
+        self.landmarks = landmarks
+        self._dict = None
+
+    def to_dict(self):
+        if self._dict is None:
+            t0 = time.perf_counter()
+            self._dict = extract_keypoints(self.landmarks)
+            telemetry.record("keypoints", time.perf_counter() - t0)
+        return self._dict
+
 
-    for lm_id, lm in enumerate(res.pose_landmarks.landmark):
-        name = mp_pose.PoseLandmark(lm_id).name
-        keypoints[name] = {
-            "x": round(lm.x, 4),
-            "y": round(lm.y, 4),
-            "z": round(lm.z, 4)
-        }
+def draw_pose(frame, landmarks, color=(224, 224, 224)):
+    """Draw the pose skeleton from a landmarks array (works for both inference modes)."""
+    import cv2
+    from mediapipe.python.solutions.pose import POSE_CONNECTIONS  # already loaded by the model by now
 
-    return keypoints
+    h, w = frame.shape[:2]
+    pts = (landmarks[:, :2] * (w, h)).astype(int).tolist()
+    for a, b in POSE_CONNECTIONS:
+        cv2.line(frame, tuple(pts[a]), tuple(pts[b]), color, 2)
+    for x, y in pts:
+        cv2.circle(frame, (x, y), 3, (0, 0, 255), -1)
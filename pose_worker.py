@@ -0,0 +1,261 @@
+import multiprocessing
+import queue
+import time
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from config import POSE_WORKER_SLOTS, POSE_WORKER_TIMEOUT
+
+# a result with slot None reports the options the worker's model runs with: once it is built, and after
+# every configure() (unchanged if the new model could not be built)
+
+
+class FrameRing:
+    """
+    Fixed number of frame-sized uint8 slots in one shared memory block.
+    The creator owns (and unlinks) the block; the worker attaches by name.
+    """
+
+    def __init__(self, shape, slots, name=None):
+        self.shape = tuple(shape)
+        self.slots = slots
+        self.owner = name is None
+        size = int(np.prod(self.shape)) * slots
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size)
+        self.frames = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=self.shm.buf)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def close(self):
+        self.frames = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _worker_main(jobs, results, pose_options):
+    """Pose worker process: read a slot, run MediaPipe, send back the landmarks array."""
+    import mediapipe as mp
+    from pose_stream import landmarks_array
+
+    pose = mp.solutions.pose.Pose(**pose_options)
+    results.put((None, None, pose_options))
+    ring = None  # attached once the first frame's shape is known
+    try:
+        while True:
+            job = jobs.get()
+            if job is None:
+                break
+            if isinstance(job, dict):
+                if "ring" in job:  # first frame, or a larger one: attach the (new) block
+                    if ring is not None:
+                        ring.close()
+                    ring = FrameRing(*job["ring"])
+                else:  # configure(): rebuild the model with new options
+                    new = _rebuild(pose, {**pose_options, **job})
+                    if new is not None:
+                        pose, pose_options = new, {**pose_options, **job}
+                    results.put((None, None, pose_options))
+                continue
+            slot, frame_id, h, w = job
+            rgb = cv2.cvtColor(ring.frames[slot, :h, :w], cv2.COLOR_BGR2RGB)
+            results.put((slot, frame_id, landmarks_array(pose.process(rgb))))
+    finally:
+        pose.close()
+        if ring is not None:
+            ring.close()
+
+
+def _rebuild(pose, pose_options):
+    """A new Pose with these options (closing the old one), or None if it can't be built (e.g. a model can't be downloaded)."""
+    import mediapipe as mp
+    try:
+        new = mp.solutions.pose.Pose(**pose_options)
+    except Exception as e:
+        print(f"Pose options {pose_options} unavailable, keeping the current model: {e}")
+        return None
+    pose.close()
+    return new
+
+
+class LocalPose:
+    """mp_pose.Pose in the calling process (the original behaviour)."""
+
+    def __init__(self, **pose_options):
+        import mediapipe as mp
+        self.pose_options = pose_options  # what the model runs with
+        self._requested = pose_options
+        self.pose = mp.solutions.pose.Pose(**pose_options)
+
+    @property
+    def model_complexity(self):
+        return self.pose_options.get("model_complexity", 1)
+
+    def load(self, timeout=None):
+        """Nothing to wait for: the model was built by the constructor."""
+
+    def configure(self, **options):
+        """Rebuild the model with changed options (e.g. model_complexity); tracking restarts. Tried once per change."""
+        requested = {**self._requested, **options}
+        if requested == self._requested:
+            return
+        self._requested = requested
+        pose = _rebuild(self.pose, requested)
+        if pose is not None:
+            self.pose, self.pose_options = pose, requested
+
+    def process(self, frame, frame_id=0):
+        from pose_stream import landmarks_array
+        return landmarks_array(self.pose.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)))
+
+    def close(self):
+        self.pose.close()
+
+
+class PoseProcess:
+    """
+    mp_pose.Pose in a worker process so inference does not hold our GIL.
+    Frames are copied into a shared-memory ring sized by the first frame
+    (smaller ones use the top-left of a slot); a frame that does not fit
+    (e.g. a tall ROI crop after a wide first frame) replaces the ring with
+    one big enough for both, so the ring stops growing once it has seen
+    the largest height and width. Only (slot, frame_id, h, w) and the
+    small landmarks arrays cross the process boundary.
+
+    The worker starts with load() (or the first frame) and builds its
+    model before the ring exists, so that can overlap opening the camera.
+    pose_options (and model_complexity) are what the worker reports its
+    model runs with, not what configure() last asked for.
+    """
+
+    def __init__(self, slots=POSE_WORKER_SLOTS, timeout=POSE_WORKER_TIMEOUT, **pose_options):
+        self.slots = slots
+        self.timeout = timeout
+        self.pose_options = pose_options  # as last reported by the worker
+        self._requested = pose_options
+        self._loaded = False
+        self._ctx = multiprocessing.get_context("spawn")
+        self._ring = self._proc = None
+        self._busy = set()  # slots the worker has not answered for yet
+        self._next = 0
+
+    def _start(self):
+        self._jobs, self._results = self._ctx.Queue(), self._ctx.Queue()
+        self._proc = self._ctx.Process(
+            target=_worker_main,
+            args=(self._jobs, self._results, self._requested),
+            name="pose-worker",
+            daemon=True,
+        )
+        self._proc.start()
+
+    def _attach(self, shape):
+        old, self._ring = self._ring, FrameRing(shape, self.slots)
+        self._jobs.put({"ring": (shape, self.slots, self._ring.name)})
+        if old is not None:
+            # jobs are handled in order, so the worker reads queued frames from the old block before switching;
+            # unlinking only removes the name, its mapping stays valid until the worker closes it
+            old.close()
+
+    def _fits(self, shape):
+        ring = self._ring.shape
+        return shape[2:] == ring[2:] and shape[0] <= ring[0] and shape[1] <= ring[1]
+
+    def load(self, timeout=None):
+        """Start the worker and wait (up to timeout seconds) until its model is built."""
+        if self._proc is None:
+            self._start()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._loaded:
+            try:
+                self._collect(1.0)
+            except queue.Empty:
+                self._check_alive()
+                if deadline is not None and time.monotonic() > deadline:
+                    raise TimeoutError(f"pose worker not ready after {timeout}s")
+
+    @property
+    def model_complexity(self):
+        return self.pose_options.get("model_complexity", 1)
+
+    def configure(self, **options):
+        """Rebuild the worker's model with changed options; applies from the next frame. Sent once per change."""
+        requested = {**self._requested, **options}
+        if requested == self._requested:
+            return
+        self._requested = requested
+        if self._proc is not None:
+            self._jobs.put(options)
+
+    def _collect(self, timeout):
+        """(frame_id, landmarks) of the next result, or (None, None) for an options report."""
+        slot, frame_id, landmarks = self._results.get(timeout=timeout)
+        if slot is None:
+            self.pose_options, self._loaded = landmarks, True
+            return None, None
+        self._busy.discard(slot)
+        return frame_id, landmarks
+
+    def _check_alive(self):
+        if not self._proc.is_alive():
+            raise RuntimeError("pose worker process exited")
+
+    def process(self, frame, frame_id=0):
+        """Run pose on one frame; returns a (33, 4) landmarks array or None."""
+        if self._proc is None:
+            self._start()
+        if self._ring is None:
+            self._attach(frame.shape)
+        elif not self._fits(frame.shape):
+            h, w = self._ring.shape[:2]
+            self._attach((max(h, frame.shape[0]), max(w, frame.shape[1])) + frame.shape[2:])
+
+        # never overwrite a slot the worker may still be reading (after a timeout)
+        while len(self._busy) == self.slots:
+            try:
+                self._collect(self.timeout)
+            except queue.Empty:
+                self._check_alive()
+        while self._next in self._busy:
+            self._next = (self._next + 1) % self.slots
+        slot = self._next
+        self._next = (slot + 1) % self.slots
+
+        h, w = frame.shape[:2]
+        np.copyto(self._ring.frames[slot, :h, :w], frame)
+        self._busy.add(slot)
+        self._jobs.put((slot, frame_id, h, w))
+
+        while True:
+            try:
+                done_id, landmarks = self._collect(self.timeout)
+            except queue.Empty:
+                self._check_alive()
+                return None  # worker is behind; treat as a frame without a pose
+            if done_id == frame_id:
+                return landmarks
+            # late answer for a frame we already gave up on
+
+    def close(self):
+        if self._proc is not None:
+            self._jobs.put(None)
+            self._proc.join(timeout=5)
+            if self._proc.is_alive():
+                self._proc.terminate()
+            self._proc = None
+        if self._ring is not None:
+            self._ring.close()
+            self._ring = None
+
+
+def open_pose(mode, **pose_options):
+    """Pose backend for INFERENCE_MODE: "thread" (in-process) or "process" (worker process)."""
+    if mode == "process":
+        return PoseProcess(**pose_options)
+    if mode == "thread":
+        return LocalPose(**pose_options)
+    raise ValueError(f"unknown inference mode: {mode!r}")
@@ -0,0 +1,43 @@
+"""
+Where the ball will be when the client shows it.
+
+Every snapshot is already old when it reaches Unity: camera exposure,
+inference, the logic stage and the hub have all taken their share
+(ball_ts says how old). predict() moves the ball forward to the time the
+client is expected to render it:
+
+    free ball    ballistic, from its vx / vy and GRAVITY, clamped to the floor
+    held ball    with the holding hand's filtered velocity (hand_v)
+
+Velocities are in pixels per reference frame (1 / PHYSICS_REF_FPS s),
+like the rest of the game. The horizon is capped at PREDICT_MAX_HORIZON
+so a stalled pipeline never flings the ball across the screen.
+"""
+from collections import namedtuple
+
+from config import GRAVITY, PHYSICS_REF_FPS, PREDICT_MAX_HORIZON
+
+Prediction = namedtuple("Prediction", "x y t")
+
+
+def predict(snap, at):
+    """Prediction of the snapshot's ball position at wall-clock time `at`."""
+    horizon = min(max(at - snap.ball_ts, 0.0), PREDICT_MAX_HORIZON)
+    r = horizon * PHYSICS_REF_FPS  # reference frames ahead
+    x, y = snap.ball_x, snap.ball_y
+    if snap.holding:
+        hv = snap.hand_v
+        if hv is not None:
+            if snap.hold_hand == "left":
+                vx, vy = hv[0], hv[1]
+            elif snap.hold_hand == "right":
+                vx, vy = hv[2], hv[3]
+            else:
+                vx, vy = (hv[0] + hv[2]) / 2, (hv[1] + hv[3]) / 2
+            x, y = x + vx * r, y + vy * r
+    else:
+        x = x + snap.ball_vx * r
+        y = y + snap.ball_vy * r + 0.5 * GRAVITY * r * r
+    if snap.floor_y is not None and y > snap.floor_y:
+        y = snap.floor_y
+    return Prediction(x, y, snap.ball_ts + horizon)
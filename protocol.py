@@ -0,0 +1,157 @@
+"""
+Wire formats for the Unity stream.
+
+Clients that connect without a subprotocol get the original JSON text
+messages. A client that offers BINARY_SUBPROTOCOL in the websocket
+handshake gets one binary message per update instead (little-endian):
+
+    header      16 bytes  <BBBbId  version, flags, action code, shot_in, frame id, capture time
+    timing      12 bytes  <Id      sequence number, time the ball position is for
+    ball        16 bytes  <4f      x, y, vx, vy
+    predicted   16 bytes  <ffd     ball x, y at the client's render time, and that time,
+                                   only when flags & FLAG_PREDICTED
+    pose       396 bytes  33 x 3 float32 (x, y, z), only when flags & FLAG_POSE
+
+shot_in is -1 for "no shot" (JSON null), 0 for a miss and 1 for a make.
+Times are seconds since the epoch on the server's clock. The sequence
+number increases with every published snapshot; a client can drop any
+message whose seq is not newer than the last one it applied.
+unity/BinaryPoseDecoder.cs is the matching decoder. Its action table is
+generated from ACTIONS; after adding or renaming a move in gestures.py run
+
+    python protocol.py      # rewrites BinaryPoseDecoder.Actions
+
+Clients may send their joystick input as one binary message too:
+
+    input       20 bytes  <B3x4f   INPUT_TAG, move_x, move_y, offset_x, offset_z
+"""
+import json
+import os
+import re
+import struct
+import sys
+
+import numpy as np
+
+from game_state import action_name, snapshot_message
+from gestures import LABELS
+
+PROTOCOL_VERSION = 3
+BINARY_SUBPROTOCOL = f"bball.bin.v{PROTOCOL_VERSION}"
+SUBPROTOCOLS = [BINARY_SUBPROTOCOL]
+
+HEADER = struct.Struct("<BBBbId")
+TIMING = struct.Struct("<Id")
+BALL = struct.Struct("<4f")
+PREDICTED = struct.Struct("<ffd")
+POSE_POINTS = 33
+
+FLAG_POSE = 0x01
+FLAG_PREDICTED = 0x02
+
+INPUT = struct.Struct("<B3x4f")
+INPUT_TAG = 0x49  # "I"; JSON messages start with "{"
+
+# Action codes; the index is what goes on the wire. The ball states, then one per gestures.LABELS
+# entry (the plain release and every move), so a new move gets a code without edits here.
+ACTIONS = [
+    "dribbling",
+    "holding_left", "holding_right", "holding_both", "holding_auto",
+] + [action_name(label) for label in LABELS[1:]]
+ACTION_CODES = {name: code for code, name in enumerate(ACTIONS)}
+ACTION_UNKNOWN = 255
+if len(ACTION_CODES) != len(ACTIONS) or len(ACTIONS) >= ACTION_UNKNOWN:
+    raise ValueError(f"move names must give unique action names: {ACTIONS}")
+
+CSHARP_DECODER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "unity", "BinaryPoseDecoder.cs")
+
+
+def encode_json(snap, predicted=None):
+    """predicted: an optional prediction.Prediction of the ball at the client's render time."""
+    return json.dumps(snapshot_message(snap, predicted))
+
+
+def encode_binary(snap, predicted=None):
+    shot = -1 if snap.shot_in is None else int(bool(snap.shot_in))
+    flags = FLAG_POSE if snap.landmarks is not None else 0
+    if predicted is not None:
+        flags |= FLAG_PREDICTED
+    parts = [
+        HEADER.pack(
+            PROTOCOL_VERSION, flags, ACTION_CODES.get(snap.action, ACTION_UNKNOWN), shot,
+            snap.frame_id & 0xFFFFFFFF, snap.ts,
+        ),
+        TIMING.pack(snap.seq & 0xFFFFFFFF, snap.ball_ts),
+        BALL.pack(snap.ball_x, snap.ball_y, snap.ball_vx, snap.ball_vy),
+    ]
+    if predicted is not None:
+        parts.append(PREDICTED.pack(predicted.x, predicted.y, predicted.t))
+    if flags & FLAG_POSE:
+        parts.append(np.ascontiguousarray(snap.landmarks[:, :3], dtype="<f4").tobytes())
+    return b"".join(parts)
+
+
+def decode_binary(data):
+    """Inverse of encode_binary, for tools and tests: returns a dict like the JSON message."""
+    version, flags, action, shot, frame_id, ts = HEADER.unpack_from(data, 0)
+    if version != PROTOCOL_VERSION:
+        raise ValueError(f"unsupported protocol version {version}")
+    offset = HEADER.size
+    seq, ball_ts = TIMING.unpack_from(data, offset)
+    offset += TIMING.size
+    x, y, vx, vy = BALL.unpack_from(data, offset)
+    offset += BALL.size
+    message = {
+        "seq": seq,
+        "frame_id": frame_id,
+        "ts": ts,
+        "ball_ts": ball_ts,
+        "action": ACTIONS[action] if action < len(ACTIONS) else None,
+        "shot_in": None if shot < 0 else bool(shot),
+        "ball": {"x": x, "y": y, "vx": vx, "vy": vy},
+        "pose": None,
+    }
+    if flags & FLAG_PREDICTED:
+        px, py, pt = PREDICTED.unpack_from(data, offset)
+        offset += PREDICTED.size
+        message["predicted"] = {"x": px, "y": py, "t": pt}
+    if flags & FLAG_POSE:
+        pose = np.frombuffer(data, dtype="<f4", count=POSE_POINTS * 3, offset=offset)
+        message["pose"] = pose.reshape(POSE_POINTS, 3)
+    return message
+
+
+def select_subprotocol(connection, subprotocols):
+    """websockets.serve hook: pick the binary format if offered, else fall back to JSON."""
+    for subprotocol in SUBPROTOCOLS:
+        if subprotocol in subprotocols:
+            return subprotocol
+    return None
+
+
+def encoder_for(subprotocol):
+    """Message encoder for a connection's negotiated subprotocol."""
+    if subprotocol == BINARY_SUBPROTOCOL:
+        return encode_binary
+    return encode_json
+
+
+def write_csharp_actions(path=CSHARP_DECODER):
+    """Rewrite the Actions table and the version in the Unity decoder from ACTIONS; True if it changed."""
+    with open(path, newline="") as f:
+        source = f.read()
+    rows = ",\n".join(f'        "{name}"' for name in ACTIONS)
+    updated = re.sub(r"(static readonly string\[\] Actions =\s*\{\n).*?(\n\s*\};)", lambda m: m[1] + rows + "," + m[2],
+                     source, count=1, flags=re.S)
+    updated = re.sub(r"Version = \d+;", f"Version = {PROTOCOL_VERSION};", updated, count=1)
+    updated = re.sub(r'Subprotocol = "[^"]*";', f'Subprotocol = "{BINARY_SUBPROTOCOL}";', updated, count=1)
+    if updated == source:
+        return False
+    with open(path, "w", newline="") as f:
+        f.write(updated)
+    return True
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else CSHARP_DECODER
+    print(f"{path}: {'updated' if write_csharp_actions(path) else 'already up to date'}")
@@ -0,0 +1,146 @@
+"""
+Adaptive quality: trade pose accuracy for frame rate on slow machines.
+
+QUALITY_LEVELS is a ladder from best to cheapest, each step a
+(model_complexity, downscale, skip, overlay) setting:
+
+    model_complexity  mp_pose.Pose model (0 lite, 1 full, 2 heavy)
+    downscale         factor applied to the frame before inference
+    skip              run inference on every skip-th camera frame only
+                      (at least every INFERENCE_EVERY-th; see tracking.py)
+    overlay           draw the pose skeleton on the preview
+
+The controller times every inference call, so each step down the ladder
+must make inference cheaper: the overlay goes off together with a
+cheaper input, never on its own, since drawing it is not what is
+measured. Once a level has been measured for QUALITY_HOLD seconds it
+compares the median cost per camera frame (inference time / frames per
+inference) against the TARGET_FPS budget: over budget steps down the
+ladder; comfortably under (QUALITY_HEADROOM) steps back up, unless the
+better level was measured recently and did not fit.
+
+observe() also takes the model_complexity the pose backend actually
+runs: when a level's model can't be loaded, the backend keeps the old
+one, and the reports say so instead of advertising the level's.
+
+The starting level, every change, and a refresh every
+QUALITY_REPORT_INTERVAL seconds go to on_report as a {"type": "quality",
+...} message for the clients (BroadcastHub.post also hands the latest one
+to clients that connect later).
+"""
+import time
+from collections import deque, namedtuple
+
+import cv2
+
+from config import (
+    INFERENCE_EVERY, QUALITY_HEADROOM, QUALITY_HOLD, QUALITY_LEVELS, QUALITY_REPORT_INTERVAL, QUALITY_RETRY,
+    TARGET_FPS,
+)
+
+Level = namedtuple("Level", "model_complexity downscale skip overlay")
+
+WINDOW = 30  # inference timings kept per level; the decision uses their median
+
+
+def scale(frame, factor):
+    """The frame resized by factor for inference; landmarks are normalized, so nothing to map back."""
+    if factor == 1:
+        return frame
+    return cv2.resize(frame, None, fx=factor, fy=factor, interpolation=cv2.INTER_AREA)
+
+
+class QualityController:
+    """Picks a Level from the ladder to hold target_fps; observe() once per inference."""
+
+    def __init__(self, target_fps=TARGET_FPS, levels=QUALITY_LEVELS, every=INFERENCE_EVERY, on_report=None,
+                 clock=time.monotonic):
+        self.target_fps = target_fps
+        self.every = max(1, every)
+        self.levels = [Level(*level) for level in levels]
+        self.on_report = on_report
+        self.clock = clock
+        self.index = 0
+        self.level = self.levels[0]
+        self._costs = deque(maxlen=WINDOW)
+        self._failed = {}  # level index -> when it last had to be abandoned
+        self._since = None  # when the current level started being measured
+        self._reported = None
+        self._frames = 0    # inferences since the last report, for the effective rate
+        self.fps = 0.0
+        self.model_complexity = self.level.model_complexity  # the model actually running, as last observed
+        if on_report is not None:
+            on_report(self.report())  # clients know the level before the first change or refresh
+
+    @property
+    def enabled(self):
+        return bool(self.target_fps) and len(self.levels) > 1
+
+    @property
+    def interval(self):
+        """Camera frames per full inference at the current level."""
+        return max(self.every, self.level.skip)
+
+    def wants(self, frame_id):
+        """False for camera frames that get no inference at the current level."""
+        return frame_id % self.interval == 0
+
+    def observe(self, seconds, model_complexity=None):
+        now = self.clock()
+        self._frames += 1
+        if self._since is None:
+            self._since = self._reported = now
+        if model_complexity is not None and model_complexity != self.model_complexity:
+            if model_complexity != self.level.model_complexity:
+                print(f"Quality level {self.index}: running model_complexity {model_complexity}, "
+                      f"not {self.level.model_complexity}")
+            self.model_complexity = model_complexity
+            self._costs.clear()  # timings of the other model say nothing about this one
+            self._since = now
+            self._report(now)
+        if self.enabled:
+            self._costs.append(seconds)
+            if len(self._costs) == WINDOW and now - self._since >= QUALITY_HOLD:
+                self._decide(now)
+        if now - self._reported >= QUALITY_REPORT_INTERVAL:
+            self._report(now)
+
+    def _decide(self, now):
+        budget = 1.0 / self.target_fps
+        per_frame = sorted(self._costs)[WINDOW // 2] / self.interval
+        if per_frame > budget and self.index < len(self.levels) - 1:
+            self._failed[self.index] = now
+            self._set(self.index + 1, now)
+        elif per_frame * QUALITY_HEADROOM < budget and self.index > 0:
+            failed = self._failed.get(self.index - 1)
+            if failed is None or now - failed >= QUALITY_RETRY:
+                self._set(self.index - 1, now)
+
+    def _set(self, index, now):
+        old, self.index, self.level = self.level, index, self.levels[index]
+        self._costs.clear()
+        self._since = now
+        print(f"Quality level {index}: {self.level} (was {old})")
+        self._report(now)
+
+    def report(self):
+        """The current decision as a client message."""
+        level = self.level
+        return {
+            "type": "quality",
+            "level": self.index,
+            "levels": len(self.levels),
+            "model_complexity": self.model_complexity,  # can lag or differ from the level's (see observe())
+            "downscale": level.downscale,
+            "skip": self.interval,
+            "overlay": level.overlay,
+            "target_fps": self.target_fps,
+            "fps": round(self.fps, 1),  # pose updates per second actually delivered
+        }
+
+    def _report(self, now):
+        if now > self._reported:
+            self.fps = self._frames / (now - self._reported)
+        self._frames, self._reported = 0, now
+        if self.on_report is not None:
+            self.on_report(self.report())
@@ -0,0 +1,75 @@
+"""
+Non-blocking, rate-limited logging for hot paths.
+
+print() on the event loop or a pipeline thread blocks on the console.
+log() only checks a per-key rate limit and appends to a bounded queue;
+a background thread formats and prints. Each key (e.g. "input") gets at
+most LOG_RATE lines per second; the next line that gets through says how
+many were suppressed. When the queue is full, lines are dropped and
+counted the same way. Call flush() before exiting so queued lines are
+not lost with the daemon thread.
+
+    log("input", "Unity input: move=({:.2f},{:.2f})", move_x, move_y)
+"""
+import sys
+import threading
+import time
+from collections import deque
+
+from config import LOG_QUEUE_SIZE, LOG_RATE
+
+
+class RateLimitedLog:
+    def __init__(self, rate=LOG_RATE, size=LOG_QUEUE_SIZE, stream=None):
+        self.min_interval = 1.0 / rate if rate else 0.0
+        self.stream = stream
+        self._lines = deque(maxlen=size)
+        self._wake = threading.Event()
+        self._last = {}        # key -> monotonic time of its last line
+        self._suppressed = {}  # key -> lines skipped since then
+        self._thread = None
+        self._busy = False     # the writer is printing a line it already took off the queue
+
+    def __call__(self, key, fmt, *args):
+        """Queue fmt.format(*args) unless `key` logged less than 1 / LOG_RATE seconds ago."""
+        now = time.monotonic()
+        last = self._last.get(key)
+        if last is not None and now - last < self.min_interval:
+            self._suppressed[key] = self._suppressed.get(key, 0) + 1
+            return
+        self._last[key] = now
+        skipped = self._suppressed.pop(key, 0)
+        if len(self._lines) == self._lines.maxlen:
+            self._suppressed[key] = skipped + 1  # writer is behind; report it with the next line
+            return
+        self._lines.append((fmt, args, skipped))
+        if self._thread is None:
+            self._start()
+        self._wake.set()
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name="log", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            while self._lines:
+                self._busy = True
+                fmt, args, skipped = self._lines.popleft()
+                line = fmt.format(*args)
+                if skipped:
+                    line += f" (+{skipped} suppressed)"
+                print(line, file=self.stream or sys.stdout, flush=True)
+                self._busy = False
+
+    def flush(self, timeout=1.0):
+        """Wait (at most `timeout` seconds) until every queued line has been printed."""
+        deadline = time.monotonic() + timeout
+        while (self._lines or self._busy) and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+
+# the shared instance
+log = RateLimitedLog()
@@ -0,0 +1,144 @@
+"""
+Pose-trace recording and headless replay.
+
+A recording is a small header followed by fixed-size little-endian
+records, one per processed frame, appended as the game runs:
+
+    header   16 bytes  magic b"BBRC", version, header size, record size
+    record  548 bytes  RECORD_DTYPE: frame id, capture time, frame size,
+                       landmarks (33 x 4 float32) and the action that frame produced
+
+Replay memory-maps the file and feeds every record through the same
+GameLogic / BallPhysics code with the recorded timestamps as the clock,
+so it needs no camera, no pose model and no window, and runs as fast
+as the CPU allows:
+
+    python recorder.py session.bbrc
+"""
+import struct
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+from pose_stream import NUM_LANDMARKS
+from protocol import ACTIONS, ACTION_CODES, ACTION_UNKNOWN
+
+MAGIC = b"BBRC"
+VERSION = 2  # 2: action codes are protocol.ACTIONS built from gestures.MOVES
+HEADER = struct.Struct("<4sHHI4x")
+
+RECORD_DTYPE = np.dtype([
+    ("frame_id", "<u4"),
+    ("ts", "<f8"),
+    ("width", "<u2"),
+    ("height", "<u2"),
+    ("has_pose", "u1"),
+    ("action", "u1"),
+    ("pad", "V2"),
+    ("landmarks", "<f4", (NUM_LANDMARKS, 4)),
+])
+
+
+class Recorder:
+    """Append-only writer; one write() per frame, from the logic stage."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, HEADER.size, RECORD_DTYPE.itemsize))
+        self._record = np.zeros(1, dtype=RECORD_DTYPE)  # reused, so writing a frame doesn't allocate
+        self.frames = 0
+
+    def write(self, frame_id, ts, width, height, landmarks, action):
+        r = self._record[0]
+        r["frame_id"] = frame_id & 0xFFFFFFFF
+        r["ts"] = ts
+        r["width"], r["height"] = width, height
+        r["action"] = ACTION_CODES.get(action, ACTION_UNKNOWN)
+        if landmarks is None:
+            r["has_pose"] = 0
+            r["landmarks"] = 0
+        else:
+            r["has_pose"] = 1
+            r["landmarks"] = landmarks
+        self._file.write(self._record.tobytes())
+        self.frames += 1
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+def read_recording(path):
+    """Memory-map a recording as a structured array of RECORD_DTYPE (no copy)."""
+    with open(path, "rb") as f:
+        magic, version, header_size, record_size = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a pose recording")
+    if version != VERSION or record_size != RECORD_DTYPE.itemsize:
+        raise ValueError(f"unsupported recording version {version} (record size {record_size})")
+    return np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=header_size)
+
+
+def action_name(code):
+    return ACTIONS[code] if code < len(ACTIONS) else None
+
+
+def replay(path, unity_input=None):
+    """
+    Run a recording through fresh game state and physics, stepping the
+    physics clock to each frame's timestamp instead of the wall clock.
+
+    Returns a dict with frames, elapsed (wall seconds), fps, the action
+    counts and the frames whose action differs from the recorded one.
+    """
+    # imported here so `import recorder` from the mains stays cheap
+    from game import GameLogic
+    from game_state import GameState
+    from physics import BallPhysics
+
+    records = read_recording(path)
+    state = GameState()
+    physics = BallPhysics(state)  # ticker never started: advanced to each recorded timestamp below
+    logic = GameLogic(state, physics, unity_input)
+
+    actions = Counter()
+    mismatches = []
+    start = time.perf_counter()
+    for r in records:
+        ts = float(r["ts"])
+        lm = np.array(r["landmarks"]) if r["has_pose"] else None
+        physics.advance(ts)
+        snap = logic.update(int(r["frame_id"]), ts, lm, int(r["width"]), int(r["height"]))
+        actions[snap.action] += 1
+        recorded = action_name(int(r["action"]))
+        if snap.action != recorded:
+            mismatches.append((int(r["frame_id"]), recorded, snap.action))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "frames": len(records),
+        "elapsed": elapsed,
+        "fps": len(records) / elapsed if elapsed > 0 else float("inf"),
+        "actions": dict(actions),
+        "mismatches": mismatches,
+    }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("usage: python recorder.py RECORDING")
+    result = replay(sys.argv[1])
+    duration = 0.0
+    records = read_recording(sys.argv[1])
+    if len(records) > 1:
+        duration = float(records["ts"][-1] - records["ts"][0])
+    print(f"{result['frames']} frames ({duration:.1f}s recorded) replayed in "
+          f"{result['elapsed']:.3f}s, {result['fps']:.0f} fps")
+    for name, count in sorted(result["actions"].items(), key=lambda kv: -kv[1]):
+        print(f"  {name:<20} {count}")
+    print(f"{len(result['mismatches'])} frames differ from the recorded action")
+    for frame_id, recorded, replayed in result["mismatches"][:20]:
+        print(f"  frame {frame_id}: recorded {recorded}, replayed {replayed}")
@@ -0,0 +1,96 @@
+"""
+Region of interest for pose inference.
+
+Most of a camera frame is empty court. Once a pose has been found, the
+next frames are cropped to the previous landmarks' bounding box plus
+ROI_MARGIN on each side (and shrunk to ROI_MAX_SIDE pixels), so colour
+conversion and inference only see the player. Landmarks found in the
+crop are mapped back to full-frame normalized coordinates, so the pixel
+thresholds in the gesture logic (HOLD_DIST, RELEASE_DIST, ...) are
+unchanged. When the pose is lost the next frame is searched whole again.
+
+The crop only moves when the player leaves it or it has become much
+larger than needed, so MediaPipe's own frame-to-frame tracking sees a
+steady image most of the time.
+"""
+import cv2
+import numpy as np
+
+from config import ROI_ENABLED, ROI_MARGIN, ROI_MAX_SIDE, ROI_MIN_VISIBILITY
+from pose_stream import VIS, X, Y
+
+
+class RoiTracker:
+    """crop() before inference, track() after it; one per camera. Disabled, both pass through."""
+
+    def __init__(self, enabled=ROI_ENABLED, margin=ROI_MARGIN, max_side=ROI_MAX_SIDE,
+                 min_visibility=ROI_MIN_VISIBILITY):
+        self.enabled = enabled
+        self.margin = margin
+        self.max_side = max_side
+        self.min_visibility = min_visibility
+        self.box = None  # (x0, y0, x1, y1) pixels of the current crop; None = whole frame
+        self._size = None
+
+    def crop(self, frame):
+        """(input image, box) for this frame; box is None when it is the whole frame."""
+        if not self.enabled:
+            return frame, None
+        h, w = frame.shape[:2]
+        if (w, h) != self._size:
+            self.box, self._size = None, (w, h)  # camera resolution changed
+        box = self.box
+        image = frame if box is None else frame[box[1]:box[3], box[0]:box[2]]
+        side = max(image.shape[:2])
+        if self.max_side and side > self.max_side:
+            f = self.max_side / side
+            image = cv2.resize(image, None, fx=f, fy=f, interpolation=cv2.INTER_AREA)
+        return image, box
+
+    def track(self, landmarks, box):
+        """Map landmarks found in `box` back to the full frame and place the next crop."""
+        if not self.enabled:
+            return landmarks
+        if landmarks is None:
+            self.box = None  # lost: search the whole frame next time
+            return None
+        if box is not None:
+            w, h = self._size
+            x0, y0, x1, y1 = box
+            sx, sy = (x1 - x0) / w, (y1 - y0) / h
+            landmarks = landmarks.copy()
+            landmarks[:, X] = landmarks[:, X] * sx + x0 / w
+            landmarks[:, Y] = landmarks[:, Y] * sy + y0 / h
+            landmarks[:, 2] *= sx  # z is on the same scale as x
+        self._place(landmarks)
+        return landmarks
+
+    def _place(self, landmarks):
+        w, h = self._size
+        seen = landmarks[landmarks[:, VIS] >= self.min_visibility]
+        if not len(seen):
+            self.box = None
+            return
+        (lx, ly), (hx, hy) = seen[:, :2].min(axis=0), seen[:, :2].max(axis=0)
+        mx, my = (hx - lx) * self.margin, (hy - ly) * self.margin
+        need = (
+            max(int((lx - mx) * w), 0), max(int((ly - my) * h), 0),
+            min(int(np.ceil((hx + mx) * w)), w), min(int(np.ceil((hy + my) * h)), h),
+        )
+        if need[2] - need[0] < 2 or need[3] - need[1] < 2:
+            self.box = None
+            return
+        box = self.box
+        if box is not None:
+            inside = box[0] <= need[0] and box[1] <= need[1] and box[2] >= need[2] and box[3] >= need[3]
+            area = (box[2] - box[0]) * (box[3] - box[1])
+            if inside and (need[2] - need[0]) * (need[3] - need[1]) * 2 > area:
+                return  # still fits and not much too big: keep the crop steady
+        # grow the new crop by half a margin more, so small moves don't move it again
+        gx, gy = int(mx * w / 2), int(my * h / 2)
+        self.box = (
+            max(need[0] - gx, 0), max(need[1] - gy, 0),
+            min(need[2] + gx, w), min(need[3] + gy, h),
+        )
+        if self.box == (0, 0, w, h):
+            self.box = None
@@ -0,0 +1,274 @@
+"""
+Columnar session log: what the game did, frame by frame, for per-session
+stats (dribbles, crossovers, shot attempts, ...).
+
+Every frame out of the game logic becomes one row: frame id, time, action
+and the move that fired (if any), the ball's position and velocity, and
+optionally the pose landmarks. write() stores the row into preallocated
+per-column chunk arrays (SESSION_LOG_CHUNK rows, SESSION_LOG_BUFFERS of
+them recycled); a full chunk goes to a writer thread that appends each
+column to its own file, so the logic stage never waits for the disk.
+
+On disk a session is a directory under SESSION_LOG_DIR:
+
+    meta.json         column dtypes and shapes, gesture and action names, start / end time
+    <column>.bin      raw little-endian values, one row after another
+
+Readers memory-map the columns (rows = file size / row size, so a session
+cut short by a crash is still readable) and scan them with NumPy:
+
+    for s in sessions("sessions"):
+        print(s.name, s.summary()["crossovers"])
+
+    python sessionlog.py sessions     # one line per session, plus totals
+"""
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from config import SESSION_LOG_BUFFERS, SESSION_LOG_CHUNK, SESSION_LOG_DIR, SESSION_LOG_LANDMARKS
+from gestures import LABELS
+from pose_stream import NUM_LANDMARKS
+from protocol import ACTIONS, ACTION_CODES, ACTION_UNKNOWN
+from telemetry import telemetry
+
+VERSION = 1
+
+COLUMNS = (
+    ("frame_id", "<u4", ()),
+    ("ts", "<f8", ()),
+    ("action", "u1", ()),    # protocol.ACTIONS code
+    ("gesture", "u1", ()),   # gestures.LABELS code of the move that fired on this frame, 0 if none
+    ("holding", "u1", ()),
+    ("ball_x", "<f4", ()),
+    ("ball_y", "<f4", ()),
+    ("ball_vx", "<f4", ()),
+    ("ball_vy", "<f4", ()),
+    ("has_pose", "u1", ()),
+    ("landmarks", "<f4", (NUM_LANDMARKS, 4)),
+)
+
+GESTURE_CODES = {name: code for code, name in enumerate(LABELS)}
+
+# moves counted together by summary()
+DRIBBLES = ("Dribble (left)", "Dribble (right)", "Two-hand Dribble")
+CROSSOVERS = ("Cross", "Between Legs", "Behind Back")
+SHOTS = ("Real Shot", "Fake Shot")
+
+
+# ---------- Writing ----------
+class SessionLog:
+    """Writer for one session; write() from the logic stage, close() at the end."""
+
+    def __init__(self, root=SESSION_LOG_DIR, chunk=SESSION_LOG_CHUNK, buffers=SESSION_LOG_BUFFERS,
+                 landmarks=SESSION_LOG_LANDMARKS):
+        self.columns = [c for c in COLUMNS if landmarks or c[0] != "landmarks"]
+        self.chunk = chunk
+        self.started = time.time()
+        name = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started))
+        self.path = os.path.join(root, name)
+        for n in range(2, 100):  # two sessions in the same second must not share files
+            if not os.path.exists(self.path):
+                break
+            self.path = os.path.join(root, f"{name}-{n}")
+        os.makedirs(self.path)
+        self._write_meta()
+        self._spare = deque(self._allocate() for _ in range(max(buffers, 1)))
+        self._cols = self._spare.popleft()
+        self._n = 0
+        self.frames = 0
+        self._chunks = queue.SimpleQueue()  # (columns, rows) for the writer; None to finish
+        self._thread = threading.Thread(target=self._run, name="sessionlog", daemon=True)
+        self._thread.start()
+
+    def _allocate(self):
+        return {name: np.zeros((self.chunk,) + shape, dtype=dtype) for name, dtype, shape in self.columns}
+
+    def _write_meta(self, **extra):
+        meta = {
+            "version": VERSION,
+            "started": self.started,
+            "columns": {name: [dtype, list(shape)] for name, dtype, shape in self.columns},
+            "gestures": list(LABELS),  # what the gesture codes mean, so new moves don't break old logs
+            "actions": list(ACTIONS),  # and the action codes
+            **extra,
+        }
+        with open(os.path.join(self.path, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=1)
+
+    def write(self, snap, gesture=""):
+        """One row from a game_state.Snapshot and the frame's move (GameLogic.gesture)."""
+        cols, i = self._cols, self._n
+        cols["frame_id"][i] = snap.frame_id & 0xFFFFFFFF
+        cols["ts"][i] = snap.ts
+        cols["action"][i] = ACTION_CODES.get(snap.action, ACTION_UNKNOWN)
+        cols["gesture"][i] = GESTURE_CODES[gesture] if gesture else 0  # KeyError: a move missing from gestures.MOVES
+        cols["holding"][i] = snap.holding
+        cols["ball_x"][i], cols["ball_y"][i] = snap.ball_x, snap.ball_y
+        cols["ball_vx"][i], cols["ball_vy"][i] = snap.ball_vx, snap.ball_vy
+        cols["has_pose"][i] = snap.landmarks is not None
+        if "landmarks" in cols:
+            cols["landmarks"][i] = 0 if snap.landmarks is None else snap.landmarks
+        self._n = i + 1
+        if self._n == self.chunk:
+            self._flush()
+
+    def _flush(self):
+        if self._n:
+            self._chunks.put((self._cols, self._n))
+            self.frames += self._n
+            if self._spare:
+                self._cols = self._spare.popleft()
+            else:
+                telemetry.count("sessionlog_alloc")  # the writer is behind; never wait for it
+                self._cols = self._allocate()
+            self._n = 0
+
+    def _run(self):
+        files = {name: open(os.path.join(self.path, name + ".bin"), "ab") for name, _, _ in self.columns}
+        try:
+            while True:
+                item = self._chunks.get()
+                if item is None:
+                    break
+                cols, n = item
+                t0 = time.perf_counter()
+                for name, f in files.items():
+                    f.write(cols[name][:n].data)  # contiguous leading rows: no copy
+                    f.flush()
+                telemetry.record("sessionlog_flush", time.perf_counter() - t0)
+                self._spare.append(cols)
+        finally:
+            for f in files.values():
+                f.close()
+
+    def close(self):
+        """Write what is buffered, wait for the writer and record the end time."""
+        self._flush()
+        self._chunks.put(None)
+        self._thread.join()
+        self._write_meta(ended=time.time(), frames=self.frames)
+
+
+# ---------- Reading ----------
+class Session:
+    """One logged session; columns are memory-mapped on first access."""
+
+    def __init__(self, path):
+        self.path = path
+        self.name = os.path.basename(os.path.normpath(path))
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        if self.meta.get("version") != VERSION:
+            raise ValueError(f"{path}: unsupported session log version {self.meta.get('version')}")
+        self.labels = tuple(self.meta["gestures"])  # gesture code -> move name, as written
+        self.codes = {name: code for code, name in enumerate(self.labels)}
+        self._columns = {}
+
+    def __getitem__(self, name):
+        column = self._columns.get(name)
+        if column is None:
+            dtype, shape = self.meta["columns"][name]
+            dtype, shape = np.dtype(dtype), tuple(shape)
+            file = os.path.join(self.path, name + ".bin")
+            rows = os.path.getsize(file) // (dtype.itemsize * int(np.prod(shape))) if os.path.exists(file) else 0
+            if rows:
+                column = np.memmap(file, dtype=dtype, mode="r", shape=(rows,) + shape)
+            else:
+                column = np.zeros((0,) + shape, dtype=dtype)
+            self._columns[name] = column
+        return column
+
+    @property
+    def frames(self):
+        # every column gets the same rows; a crash can leave one short, so use the shortest
+        return min(len(self[name]) for name in self.meta["columns"])
+
+    def column(self, name, start=None, end=None):
+        """A column, optionally only the rows with start <= ts < end."""
+        ts = self["ts"][:self.frames]
+        lo = 0 if start is None else int(np.searchsorted(ts, start))
+        hi = len(ts) if end is None else int(np.searchsorted(ts, end))
+        return self[name][lo:hi]
+
+    def events(self, start=None, end=None):
+        """(ts, move name) of every move that fired, in order."""
+        gesture = self.column("gesture", start, end)
+        rows = np.flatnonzero(gesture)
+        ts = self.column("ts", start, end)[rows]
+        return list(zip(ts.tolist(), (self.labels[code] for code in gesture[rows].tolist())))
+
+    def counts(self, start=None, end=None):
+        """{move name: times it fired}."""
+        counts = np.bincount(self.column("gesture", start, end), minlength=len(self.labels))
+        return {name: int(n) for name, n in zip(self.labels, counts) if name and n}
+
+    def timeline(self, moves, bin_seconds=60.0):
+        """(bin start times, counts per bin) of the given moves, e.g. crossovers per minute."""
+        n = self.frames
+        ts, gesture = self["ts"][:n], self["gesture"][:n]
+        if not n:
+            return np.zeros(0), np.zeros(0, dtype=np.int64)
+        edges = np.arange(ts[0], ts[-1] + bin_seconds, bin_seconds)
+        wanted = np.isin(gesture, [self.codes[m] for m in moves if m in self.codes])
+        counts, _ = np.histogram(ts[wanted], bins=edges)
+        return edges[:-1], counts
+
+    def summary(self):
+        """Per-session stats from vectorized scans over the columns."""
+        n = self.frames
+        ts = self["ts"][:n]
+        duration = float(ts[-1] - ts[0]) if n > 1 else 0.0
+        counts = np.bincount(self["gesture"][:n], minlength=len(self.labels))
+        total = lambda names: int(sum(counts[self.codes[m]] for m in names if m in self.codes))
+        holding = self["holding"][:n].astype(bool)
+        dt = np.diff(ts)
+        x, y = self["ball_x"][:n].astype(np.float64), self["ball_y"][:n].astype(np.float64)
+        minutes = duration / 60.0
+        return {
+            "session": self.name,
+            "frames": n,
+            "duration": round(duration, 1),
+            "pose": round(float(self["has_pose"][:n].mean()), 3) if n else 0.0,  # fraction of frames with a pose
+            "holding": round(float(dt[holding[:-1]].sum()), 1) if n > 1 else 0.0,  # seconds with the ball in hand
+            "ball_travel": round(float(np.hypot(np.diff(x), np.diff(y)).sum()), 1),  # pixels
+            "dribbles": total(DRIBBLES),
+            "crossovers": total(CROSSOVERS),
+            "crossovers_per_minute": round(total(CROSSOVERS) / minutes, 2) if minutes else 0.0,
+            "shot_attempts": total(SHOTS),
+            "real_shots": total(("Real Shot",)),
+            "moves": {name: int(c) for name, c in zip(self.labels, counts) if name and c},
+        }
+
+
+def sessions(root=SESSION_LOG_DIR):
+    """Every session under root, oldest first."""
+    paths = [os.path.join(root, d) for d in sorted(os.listdir(root))]
+    return [Session(p) for p in paths if os.path.exists(os.path.join(p, "meta.json"))]
+
+
+def summarize(root=SESSION_LOG_DIR):
+    """(per-session summaries, totals over all of them)."""
+    rows = [s.summary() for s in sessions(root)]
+    totals = {key: sum(r[key] for r in rows) for key in
+              ("frames", "duration", "holding", "ball_travel", "dribbles", "crossovers", "shot_attempts", "real_shots")}
+    minutes = totals["duration"] / 60.0
+    totals["crossovers_per_minute"] = round(totals["crossovers"] / minutes, 2) if minutes else 0.0
+    return rows, totals
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 or (len(sys.argv) == 1 and not SESSION_LOG_DIR):
+        sys.exit("usage: python sessionlog.py [SESSION_DIR]")
+    rows, totals = summarize(sys.argv[1] if len(sys.argv) == 2 else SESSION_LOG_DIR)
+    print(f"{'session':<18}{'minutes':>9}{'pose':>7}{'dribbles':>10}{'crossovers':>12}{'per min':>9}{'shots':>7}{'real':>6}")
+    for r in rows + [dict(totals, session="total")]:
+        pose = f"{r['pose']:.2f}" if "pose" in r else "-"
+        print(f"{r['session']:<18}{r['duration'] / 60:>9.1f}{pose:>7}{r['dribbles']:>10}{r['crossovers']:>12}"
+              f"{r['crossovers_per_minute']:>9.2f}{r['shot_attempts']:>7}{r['real_shots']:>6}")
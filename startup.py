@@ -0,0 +1,102 @@
+"""
+Startup sequence for player.Player (main.py / main2.py), timed from process start.
+
+The websocket server comes up first, so Unity's AutoConnectLoop connects
+at once and is told {"type": "status", "state": "warming"}. Behind it the
+camera and the pose model open at the same time on two threads (mediapipe
+is imported there, not at module import), the model runs WARMUP_FRAMES
+inferences on the first camera frame so the first live frames don't hit
+a cold graph, and the first frame out of the game logic switches the
+status to "live". Each status message carries the timings so far, in
+seconds since the process started:
+
+    imports      main module imported
+    server       websocket server listening
+    camera       camera open
+    model        pose model loaded
+    warmup       warm-up inferences done
+    first_frame  first frame through the game logic (time-to-first-frame)
+
+The mains import player.py first, and it imports this module first, so
+its clock starts before the rest of the imports.
+"""
+import threading
+import time
+
+from config import WARMUP_FRAMES, WARMUP_TIMEOUT
+from telemetry import telemetry
+
+STARTED = time.monotonic()  # close enough to process start: the mains import this module first
+
+
+class Startup:
+    def __init__(self, post=None, clock=time.monotonic, started=STARTED):
+        self.post = post  # e.g. BroadcastHub.post; the status message is sticky for late clients
+        self.clock = clock
+        self.started = started
+        self.timings = {}
+        self.state = None
+        telemetry.gauge("time_to_first_frame", lambda: self.timings.get("first_frame"))
+
+    def mark(self, phase):
+        self.timings[phase] = round(self.clock() - self.started, 3)
+
+    def status(self, state, **extra):
+        self.state = state
+        if self.post is not None:
+            self.post({"type": "status", "state": state, "timings": dict(self.timings), **extra})
+
+    def open(self, open_camera, open_model):
+        """
+        Call open_camera() and open_model() on two threads at once, then
+        wait for the model to load (pose_worker backends' load()).
+        Returns (camera, model); if either fails, the one that did open is
+        released (a pose worker process stopped), the status goes "failed"
+        and the error is raised.
+        """
+        opened, errors = {}, []
+
+        def run(name, fn):
+            try:
+                opened[name] = fn()
+                if name == "model":
+                    opened[name].load(WARMUP_TIMEOUT)
+                self.mark(name)
+            except Exception as e:
+                errors.append(f"{name}: {e}")
+
+        threads = [
+            threading.Thread(target=run, args=(name, fn), name=f"open-{name}", daemon=True)
+            for name, fn in (("camera", open_camera), ("model", open_model))
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        if errors:
+            # a model whose load() failed was still created: close it too
+            for name, close in (("camera", "release"), ("model", "close")):
+                if name in opened:
+                    try:
+                        getattr(opened[name], close)()
+                    except Exception as e:
+                        print(f"Startup: closing the {name} failed: {e}")
+            self.status("failed", error="; ".join(errors))
+            raise RuntimeError("startup failed: " + "; ".join(errors))
+        return opened["camera"], opened["model"]
+
+    def warm_up(self, pose, cap, frames=WARMUP_FRAMES):
+        """Run `frames` inferences on one frame read from cap (that frame is not played)."""
+        ok, frame = cap.read() if frames else (False, None)
+        if ok:
+            for i in range(frames):
+                pose.process(frame, -1 - i)  # negative ids never match a pipeline frame
+        self.mark("warmup")
+
+    def frame(self):
+        """Call for every frame out of the game logic; the first one goes live."""
+        if self.state == "live":
+            return
+        self.mark("first_frame")
+        self.status("live")
+        print("Startup: " + ", ".join(f"{phase.replace('_', ' ')} {t:.2f}s" for phase, t in self.timings.items()))
@@ -0,0 +1,202 @@
+"""
+Always-on hot-path instrumentation.
+
+Stages record durations into fixed-bucket latency histograms (a bisect
+and a list increment per sample, no allocation), counters count events
+and gauges are read only when a report is built. Reports give p50 / p95 /
+p99 per stage in milliseconds, either since start or over the window
+since a previous raw() snapshot.
+
+Reports are printed as one compact line every STATS_LOG_INTERVAL seconds
+and served on localhost:STATS_PORT, as JSON over plain HTTP
+(curl localhost:8766) or streamed to a websocket client every
+STATS_INTERVAL seconds.
+"""
+import asyncio
+import json
+import time
+from bisect import bisect_left
+
+import websockets
+
+from config import STATS_INTERVAL, STATS_LOG_INTERVAL, STATS_PORT
+
+# Bucket upper bounds in seconds: 20 µs .. ~20 s, 15% apart (so percentiles are within 15%).
+BOUNDS = []
+_b = 20e-6
+while _b < 20.0:
+    BOUNDS.append(_b)
+    _b *= 1.15
+del _b
+
+# fps is frames through this stage per second
+FPS_STAGE = "logic"
+
+# Stage order in the log line; anything else recorded goes after these.
+STAGE_ORDER = ("capture", "inference", "logic", "display", "keypoints", "encode", "send", "camera_to_wire")
+
+
+def percentile(counts, q):
+    """Upper bound (seconds) of the bucket holding the q-th percentile, or None if empty."""
+    total = sum(counts)
+    if not total:
+        return None
+    rank = q / 100.0 * total
+    seen = 0
+    for i, n in enumerate(counts):
+        seen += n
+        if seen >= rank:
+            return BOUNDS[i] if i < len(BOUNDS) else float("inf")
+    return float("inf")
+
+
+class Histogram:
+    """Fixed-size latency histogram; record() is cheap enough for every frame."""
+
+    __slots__ = ("counts",)
+
+    def __init__(self):
+        self.counts = [0] * (len(BOUNDS) + 1)  # last bucket: beyond BOUNDS[-1]
+
+    def record(self, seconds):
+        self.counts[bisect_left(BOUNDS, seconds)] += 1
+
+
+class Telemetry:
+    """Process-wide registry of histograms, counters and gauges."""
+
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+        self.started = time.monotonic()
+
+    def record(self, name, seconds):
+        hist = self.histograms.get(name)
+        if hist is None:
+            hist = self.histograms[name] = Histogram()
+        hist.record(seconds)
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def gauge(self, name, fn):
+        """Register fn() to be read at report time (e.g. a queue's drop count)."""
+        self.gauges[name] = fn
+
+    def raw(self):
+        """Copy of the current totals, to diff a later report against."""
+        return {
+            "time": time.monotonic(),
+            "counts": {name: list(h.counts) for name, h in self.histograms.items()},
+            "counters": dict(self.counters),
+        }
+
+    def report(self, since=None, now=None):
+        """JSON-ready stats; with `since` (an earlier raw()) only the window after it, up to `now`."""
+        now = now or self.raw()
+        base = since or {"time": self.started, "counts": {}, "counters": {}}
+        window = max(now["time"] - base["time"], 1e-9)
+
+        stages = {}
+        for name, counts in now["counts"].items():
+            prev = base["counts"].get(name)
+            if prev is not None:
+                counts = [a - b for a, b in zip(counts, prev)]
+            n = sum(counts)
+            if not n:
+                continue
+            stages[name] = {
+                "n": n,
+                "p50": _ms(percentile(counts, 50)),
+                "p95": _ms(percentile(counts, 95)),
+                "p99": _ms(percentile(counts, 99)),
+            }
+        counters = {name: v - base["counters"].get(name, 0) for name, v in now["counters"].items()}
+        gauges = {}
+        for name, fn in list(self.gauges.items()):
+            try:
+                gauges[name] = fn()
+            except Exception:
+                gauges[name] = None
+
+        return {
+            "uptime": round(now["time"] - self.started, 1),
+            "window": round(window, 2),
+            "fps": round(stages.get(FPS_STAGE, {}).get("n", 0) / window, 1),
+            "stages": stages,
+            "counters": counters,
+            "gauges": gauges,
+        }
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000.0, 2)
+
+
+def format_line(report):
+    """One compact log line: fps, p50/p95/p99 ms per stage, drop counters."""
+    stages = report["stages"]
+    names = [n for n in STAGE_ORDER if n in stages] + sorted(n for n in stages if n not in STAGE_ORDER)
+    parts = [f"fps {report['fps']:.1f}"]
+    for name in names:
+        s = stages[name]
+        parts.append(f"{name} {s['p50']:g}/{s['p95']:g}/{s['p99']:g}")
+    drops = {**report["gauges"], **report["counters"]}
+    if drops:
+        parts.append(" ".join(f"{k}={v}" for k, v in sorted(drops.items())))
+    return "[stats] " + " | ".join(parts)
+
+
+# the one registry everything records into
+telemetry = Telemetry()
+
+
+# ---------- Reporting ----------
+_log_task = None  # keep a reference so the task isn't garbage collected
+
+
+async def log_forever(interval=STATS_LOG_INTERVAL):
+    """Print one stats line per interval, covering that interval only."""
+    last = telemetry.raw()
+    while True:
+        await asyncio.sleep(interval)
+        now = telemetry.raw()
+        report, last = telemetry.report(last, now), now
+        if report["stages"]:
+            print(format_line(report))
+
+
+async def _stream(websocket):
+    """Websocket stats client: one window report every STATS_INTERVAL seconds."""
+    last = telemetry.raw()
+    try:
+        while True:
+            await asyncio.sleep(STATS_INTERVAL)
+            now = telemetry.raw()
+            report, last = telemetry.report(last, now), now
+            await websocket.send(json.dumps(report))
+    except websockets.ConnectionClosed:
+        pass
+
+
+def _http_report(connection, request):
+    """Plain HTTP GET (no websocket upgrade) gets the totals since start as JSON."""
+    if request.headers.get("Upgrade", "").lower() == "websocket":
+        return None
+    response = connection.respond(200, json.dumps(telemetry.report()) + "\n")
+    del response.headers["Content-Type"]
+    response.headers["Content-Type"] = "application/json"
+    return response
+
+
+async def serve_stats(port=STATS_PORT):
+    """Start the local stats endpoint and the periodic log line (when enabled)."""
+    server = None
+    if port:
+        server = await websockets.serve(_stream, "localhost", port, process_request=_http_report)
+        print(f"Stats at http://localhost:{port} (ws:// for a live stream)")
+    if STATS_LOG_INTERVAL:
+        global _log_task
+        _log_task = asyncio.create_task(log_forever())
+    return server
@@ -0,0 +1,134 @@
+"""
+Cheap keypoint tracking between full pose inferences.
+
+With INFERENCE_EVERY = N (or a quality level that skips frames) MediaPipe
+runs on every Nth frame only. The frames in between still get a landmark
+update: the last full result with the points the gesture logic reads
+(nose, elbows, wrists) moved to where they are now, by either
+
+    "flow"         pyramidal Lucas-Kanade optical flow on a small
+                   grayscale copy of the frame (TRACK_MAX_SIDE), or
+    "extrapolate"  constant velocity from the last two full results.
+
+A point the flow loses is extrapolated instead. All other landmarks keep
+their last inferred position until the next full inference.
+
+reset() only keeps a reference to an inferred frame; its grayscale copy
+is made by the track() that needs it, so with every frame inferred
+(the default) no frame is ever converted. The preview draws into the
+same buffer, so it calls release(frame) first, like video.VideoFeed.
+"""
+import threading
+
+import cv2
+import numpy as np
+
+from config import TRACK_MAX_SIDE, TRACK_METHOD
+from pose_stream import LEFT_ELBOW, LEFT_WRIST, NOSE, RIGHT_ELBOW, RIGHT_WRIST, X, Y
+
+TRACKED = np.array([NOSE, LEFT_ELBOW, RIGHT_ELBOW, LEFT_WRIST, RIGHT_WRIST])
+
+FLOW_PARAMS = dict(
+    winSize=(15, 15), maxLevel=2,
+    criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03),
+)
+
+
+class KeypointTracker:
+    """reset() with every full inference, track() for the frames in between."""
+
+    def __init__(self, method=TRACK_METHOD, max_side=TRACK_MAX_SIDE):
+        if method not in (None, "flow", "extrapolate"):
+            raise ValueError(f"unknown tracking method: {method!r}")
+        self.method = method
+        self.max_side = max_side
+        self.landmarks = None  # last full result, with TRACKED rows moved by track()
+        self._velocity = None  # TRACKED x, y per second, from the last two full results
+        self._anchor = None    # TRACKED x, y and ts of the last full result
+        self._lock = threading.Lock()  # reset() / track() run on the inference stage, release() on the preview's
+        self._frame = None     # last inferred frame, until its grayscale copy is needed (or release()d)
+        self._gray = None      # grayscale copy of the last frame, for the flow to the next one
+        self._xy = None        # TRACKED x, y (normalized) on that frame
+
+    @property
+    def enabled(self):
+        return self.method is not None
+
+    def _small_gray(self, frame):
+        h, w = frame.shape[:2]
+        f = min(1.0, self.max_side / max(h, w)) if self.max_side else 1.0
+        if f < 1.0:
+            frame = cv2.resize(frame, None, fx=f, fy=f, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+    def reset(self, frame, landmarks, ts):
+        """A full inference result for this frame (None if no pose was found)."""
+        if not self.enabled:
+            return
+        if landmarks is None:
+            self.landmarks = self._velocity = self._anchor = self._xy = None
+            with self._lock:
+                self._frame = self._gray = None
+            return
+        xy = landmarks[TRACKED, :2].astype(np.float64)
+        if self._anchor is not None and ts > self._anchor[1]:
+            self._velocity = (xy - self._anchor[0]) / (ts - self._anchor[1])
+        self._anchor = (xy, ts)
+        self.landmarks = landmarks.copy()
+        if self.method == "flow":
+            self._xy = xy
+            with self._lock:
+                self._frame, self._gray = frame, None
+
+    def release(self, frame, keep=True):
+        """
+        Call before drawing into `frame`. If it is the last inferred frame and
+        the next one may be tracked (keep), its grayscale copy is made now;
+        otherwise the reference is dropped and a tracked frame after it is
+        extrapolated instead.
+        """
+        with self._lock:
+            if self._frame is frame:
+                self._gray = self._small_gray(frame) if keep else None
+                self._frame = None
+
+    def track(self, frame, ts):
+        """Landmarks for a frame without inference, or None if there is nothing to track."""
+        if self.landmarks is None:
+            return None
+        guess = None
+        if self._velocity is not None:
+            guess = self._anchor[0] + self._velocity * (ts - self._anchor[1])
+
+        if self.method == "flow":
+            with self._lock:
+                if self._frame is not None:
+                    self._gray, self._frame = self._small_gray(self._frame), None
+                prev = self._gray
+            gray = self._small_gray(frame)
+            h, w = gray.shape
+            if prev is not None:
+                start = (self._xy * (w, h)).astype(np.float32).reshape(-1, 1, 2)
+                points, status, _ = cv2.calcOpticalFlowPyrLK(prev, gray, start, None, **FLOW_PARAMS)
+                found = status.ravel() == 1
+                xy = points.reshape(-1, 2) / (w, h)
+            else:  # the previous frame was drawn on before it was needed
+                found = np.zeros(len(TRACKED), dtype=bool)
+                xy = np.empty((len(TRACKED), 2))
+            if guess is not None:
+                xy[~found] = guess[~found]
+            else:
+                xy[~found] = self.landmarks[TRACKED[~found], :2]
+            with self._lock:
+                self._gray = gray
+            self._xy = xy
+        elif guess is not None:
+            xy = guess
+        else:
+            return self.landmarks.copy()  # one full result so far: nothing to extrapolate from
+
+        landmarks = self.landmarks.copy()
+        landmarks[TRACKED, X] = xy[:, 0]
+        landmarks[TRACKED, Y] = xy[:, 1]
+        self.landmarks = landmarks
+        return landmarks
@@ -0,0 +1,209 @@
+"""
+Parametric ball flights for clients.
+
+When the ball leaves the hands (a shot, a dribble release, a cross), the
+rest of its flight is already decided by the physics constants in
+config.py. plan() runs the same fixed-step integrator as BallPhysics
+ahead of time and cuts the result into segments at every floor or wall
+bounce and every change of gravity (the side-move assist). Each segment
+is exact at the physics step times in closed form, with τ seconds since
+the segment start:
+
+    x(τ) = x + vx * (1 - exp(-drag * τ)) / drag     (x + vx * τ without drag)
+    y(τ) = y + vy * τ + g * τ² / 2
+
+FlightTracker sends one {"type": "trajectory"} message per flight and
+then stops the per-tick position publishes from the physics thread while
+the ball follows the plan. The flight ends when the ball settles on the
+floor (any roll after that is published tick by tick, and the ball gets
+no new plan until it is hit again), a hand catches it, or it drifts
+more than TRAJECTORY_TOLERANCE pixels from the plan (joystick input, a
+new gesture). Ending posts {"active": false}; the ticks publish again,
+and a drifting ball gets a new plan. A ball that keeps drifting (re-planned less than
+TRAJECTORY_REPLAN_INTERVAL ago) is streamed tick by tick until it has
+been left alone for that long.
+"""
+import math
+import time
+
+from config import (
+    BALL_RADIUS, GRAVITY, PHYSICS_REF_FPS, SIDE_ASSIST_DURATION,
+    TRAJECTORY_HORIZON, TRAJECTORY_REPLAN_INTERVAL, TRAJECTORY_TOLERANCE,
+)
+
+
+class _Ball:
+    """The GameState fields BallPhysics.step reads and writes."""
+
+    __slots__ = ("ball_x", "ball_y", "ball_vx", "ball_vy", "dribble_energy", "holding", "side_mode", "side_mode_time")
+
+    def __init__(self, state):
+        for name in self.__slots__:
+            setattr(self, name, getattr(state, name))
+
+
+class Trajectory:
+    """Segments (t, x, y, vx, vy, g) in pixels and seconds, plus the shared horizontal drag."""
+
+    def __init__(self, segments, drag, bounces, floor_y, settled=None):
+        self.segments = segments
+        self.drag = drag
+        self.bounces = bounces  # (t, x, y) of every floor contact
+        self.floor_y = floor_y
+        self.settled = settled  # when the ball comes to rest on the floor, or None within the horizon
+
+    def at(self, t):
+        """Ball (x, y) at time t."""
+        seg = self.segments[0]
+        for s in self.segments:
+            if s[0] > t:
+                break
+            seg = s
+        t0, x, y, vx, vy, g = seg
+        tau = max(t - t0, 0.0)
+        if self.drag:
+            x += vx * (1.0 - math.exp(-self.drag * tau)) / self.drag
+        else:
+            x += vx * tau
+        return x, y + vy * tau + 0.5 * g * tau * tau
+
+    def apex(self):
+        """(t, x, y) of the highest point of the first segment (its start if it only falls)."""
+        t0, _, _, _, vy, g = self.segments[0]
+        tau = -vy / g if g > 0 and vy < 0 else 0.0
+        if len(self.segments) > 1:
+            tau = min(tau, self.segments[1][0] - t0)
+        return (t0 + tau,) + self.at(t0 + tau)
+
+    def to_message(self, flight_id):
+        r = lambda v: round(v, 4)
+        apex = self.apex()
+        landing = self.bounces[0] if self.bounces else None
+        return {
+            "type": "trajectory",
+            "id": flight_id,
+            "active": True,
+            "now": time.time(),  # server clock, so the client can line up its own
+            "drag": r(self.drag),
+            "floor_y": self.floor_y,
+            "segments": [[r(v) for v in s] for s in self.segments],
+            "apex": {"t": r(apex[0]), "x": r(apex[1]), "y": r(apex[2])},
+            "landing": None if landing is None else {"t": r(landing[0]), "x": r(landing[1]), "y": r(landing[2])},
+            "bounces": [[r(v) for v in b] for b in self.bounces],
+        }
+
+
+def plan(physics, t0, horizon=TRAJECTORY_HORIZON):
+    """
+    Simulate the free ball in physics.state from time t0 (the time of its
+    current position) until it settles on the floor or horizon seconds pass.
+    """
+    from physics import BallPhysics
+
+    ball = _Ball(physics.state)
+    sim = BallPhysics(ball, hz=1.0 / physics.dt)
+    sim.set_bounds(physics.width, physics.floor_y)
+    dt, k, f = sim.dt, sim.k, sim.friction
+    ref = PHYSICS_REF_FPS
+    drag = -math.log(f) / dt if 0 < f < 1 else 0.0
+
+    def segment(t, g_ref):
+        # closed-form coefficients that reproduce the integrator exactly at step times
+        vx = k * ball.ball_vx * drag / (1.0 - f) if drag else ball.ball_vx * ref
+        return [t, ball.ball_x, ball.ball_y, vx, (ball.ball_vy + g_ref * k / 2) * ref, g_ref * ref * ref]
+
+    def gravity(t):
+        assist = ball.side_mode and t - ball.side_mode_time < SIDE_ASSIST_DURATION
+        return GRAVITY * (0.4 if assist else 1.0)
+
+    t = t0
+    g = gravity(t + dt)
+    segments = [segment(t, g)]
+    bounces = []
+    settled = None
+    while t - t0 < horizon:
+        g_next = gravity(t + dt)
+        if g_next != g:
+            g = g_next
+            segments.append(segment(t, g))
+        t += dt
+        sim.step(t)
+        floor = ball.ball_y == physics.floor_y and ball.ball_vy <= 0
+        wall = ball.ball_x in (BALL_RADIUS, physics.width - BALL_RADIUS)
+        if floor:
+            bounces.append((t, ball.ball_x, ball.ball_y))
+            if ball.dribble_energy == 0 and abs(ball.ball_vy) < 1:
+                # settled: only rolls from here
+                ball.ball_vy = 0.0
+                segments.append(segment(t, 0.0))
+                settled = t
+                break
+        if floor or wall:
+            segments.append(segment(t, gravity(t + dt)))
+    return Trajectory(segments, drag, bounces, physics.floor_y, settled)
+
+
+class FlightTracker:
+    """
+    Watches the ball from the physics thread (under its lock): plans and
+    posts a trajectory when the ball is released, and tells BallPhysics
+    whether it may skip publishing a tick.
+    """
+
+    def __init__(self, physics, post, tolerance=TRAJECTORY_TOLERANCE):
+        self.physics = physics
+        self.post = post  # e.g. BroadcastHub.post
+        self.tolerance = tolerance
+        self.trajectory = None
+        self.flights = 0
+        self._last_hit = None
+        self._planned = float("-inf")  # when the current or last plan was made
+        self._drifted = None           # when the ball last drifted off a fresh plan
+        self._resting = False          # the last flight ended with the ball settled
+
+    def tick(self, t):
+        """Start of a physics tick; t is the time of the ball's current position."""
+        s = self.physics.state
+        if s.holding:
+            self._end()
+        elif s.last_hit_time != self._last_hit:
+            self._start(t)  # released, shot or hit: always a new flight
+        elif self.trajectory is not None:
+            if self.trajectory.settled is not None and t >= self.trajectory.settled:
+                self._end()
+                self._resting = True
+        elif not self._resting:
+            if self._drifted is None or t - self._drifted >= TRAJECTORY_REPLAN_INTERVAL:
+                self._start(t)
+        self._last_hit = s.last_hit_time
+
+    def on_track(self, t):
+        """After the tick's steps: True if the ball is where the plan says (skip the publish)."""
+        if self.trajectory is None:
+            return False
+        x, y = self.trajectory.at(t)
+        s = self.physics.state
+        if abs(x - s.ball_x) + abs(y - s.ball_y) <= self.tolerance:
+            return True
+        # something pushed the ball off the plan: publish this tick, and re-plan unless that keeps happening
+        if t - self._planned < TRAJECTORY_REPLAN_INTERVAL:
+            self._end()
+            self._drifted = t
+        else:
+            self._start(t)
+        return False
+
+    def _start(self, t):
+        if self.physics.floor_y is None:
+            return
+        self._drifted = None
+        self._resting = False
+        self._planned = t
+        self.trajectory = plan(self.physics, t)
+        self.flights += 1
+        self.post(self.trajectory.to_message(self.flights))
+
+    def _end(self):
+        if self.trajectory is not None:
+            self.trajectory = None
+            self.post({"type": "trajectory", "id": self.flights, "active": False})
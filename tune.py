@@ -0,0 +1,303 @@
+"""
+Parameter sweep for the gesture thresholds in config.py, over labeled
+pose sequences instead of a person in front of the webcam.
+
+Every combination of thresholds is one session of game_batch.BatchGame
+(its GestureConfig fields are arrays, one value per session), so a chunk
+of --batch combinations replays a sequence for about the cost of a few.
+Chunks are spread over a process pool (--jobs). For every combination we
+report per-move precision and recall and the frames per second it was
+evaluated at.
+
+Labeled sequences:
+
+    synthetic   bench.synthetic_session, labeled from its script (--cycles, 0 to leave it out)
+    recordings  --recording s.bbrc, labeled by s.bbrc.labels.json next to it:
+                [[start_ts, end_ts, "cross"], ...] in the recording's timestamps
+
+A move that fires (BatchGame.gesture) inside a labeled window of the same
+move is a hit, once per window; any other firing is a false positive and
+a window without a hit is a miss. Move names are those in GESTURES.
+
+    python tune.py                                    # random search, +-50% around config.py
+    python tune.py --param DRIBBLE_SPEED_THRESHOLD=25,35,45 --param CROSSOVER_HOLD_TIME=0.12,0.18,0.24
+    python tune.py --param HOLD_DIST=100:160 --samples 500 --json sweep.json
+"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from game_batch import BatchGame
+from game_state import GESTURE_PARAMS, GestureConfig, gesture_config
+from gestures import LABELS, MOVES
+
+
+def _gesture(move_name):
+    """A move's name in labels files: "Dribble (left)" -> "dribble", "Between Legs" -> "between_legs"."""
+    return move_name.split(" (")[0].lower().replace(" ", "_")
+
+
+# labels-file move names, one per gestures.MOVES entry (both dribble hands count as "dribble")
+GESTURES = tuple(dict.fromkeys(_gesture(move.name) for move in MOVES))
+
+# BatchGame label code -> index into GESTURES (-1: not a move, e.g. the ball simply let go)
+_GESTURE_OF = np.array([GESTURES.index(_gesture(name)) if code > 1 else -1 for code, name in enumerate(LABELS)])
+
+RANDOM_SPREAD = 0.5  # default search: every parameter within +-50% of its config.py value
+
+
+# ---------- Sequences ----------
+def load_labels(path):
+    """(starts, ends, gesture indices) arrays of a labels file, sorted by start."""
+    with open(path) as f:
+        windows = sorted(json.load(f))
+    for _, _, name in windows:
+        if name not in GESTURES:
+            raise ValueError(f"{path}: unknown move {name!r} (one of {', '.join(GESTURES)})")
+    return _windows(windows)
+
+
+def _windows(windows):
+    starts = np.array([w[0] for w in windows], dtype=np.float64)
+    ends = np.array([w[1] for w in windows], dtype=np.float64)
+    gestures = np.array([GESTURES.index(w[2]) for w in windows], dtype=np.int64)
+    return starts, ends, gestures
+
+
+def load_sequences(cycles, recordings):
+    """[(name, ts, landmarks, width, height, labels)] for the sweep; lost poses are all-NaN frames."""
+    # imported here: bench pulls in the scalar game and its dependencies, which the workers never need
+    from bench import HEIGHT, WIDTH, recorded_session, synthetic_labels, synthetic_session
+
+    sequences = []
+    if cycles:
+        ts, lm = synthetic_session(cycles)
+        sequences.append(("synthetic", ts, lm, WIDTH, HEIGHT, _windows(synthetic_labels(cycles))))
+    for path in recordings:
+        ts, lm, width, height = recorded_session(path)
+        sequences.append((os.path.basename(path), ts, lm, width, height, load_labels(path + ".labels.json")))
+    return sequences
+
+
+# ---------- Search space ----------
+def parse_param(text):
+    """NAME=v1,v2,... (values to try) or NAME=lo:hi (a range to sample)."""
+    name, _, spec = text.partition("=")
+    if name not in GESTURE_PARAMS:
+        raise argparse.ArgumentTypeError(f"{name!r} is not one of {', '.join(GESTURE_PARAMS)}")
+    try:
+        if ":" in spec:
+            lo, hi = map(float, spec.split(":"))
+            return name, (lo, hi)
+        return name, [float(v) for v in spec.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"bad values for {name}: {spec!r}")
+
+
+def combinations(params, samples=None, seed=0):
+    """
+    Rows of GESTURE_PARAMS values, config.py's first. Lists in `params`
+    form a grid; with a range among them, or `samples` given, `samples`
+    random draws (uniform over ranges, a random pick from lists).
+    Parameters not in `params` keep their config.py value.
+    """
+    default = list(gesture_config())
+    if not params:
+        params = {name: (value * (1 - RANDOM_SPREAD), value * (1 + RANDOM_SPREAD))
+                  for name, value in zip(GESTURE_PARAMS, default)}
+    rows = [default]
+    if samples is None and all(isinstance(v, list) for v in params.values()):
+        for values in itertools.product(*params.values()):
+            row = dict(zip(GESTURE_PARAMS, default))
+            row.update(zip(params, values))
+            rows.append([row[name] for name in GESTURE_PARAMS])
+        return rows
+    rng = np.random.default_rng(seed)
+    for _ in range(samples or 256):
+        row = dict(zip(GESTURE_PARAMS, default))
+        for name, spec in params.items():
+            row[name] = float(rng.uniform(*spec)) if isinstance(spec, tuple) else float(rng.choice(spec))
+        rows.append([row[name] for name in GESTURE_PARAMS])
+    return rows
+
+
+# ---------- Evaluation (worker processes) ----------
+_sequences = None
+
+
+def _init(sequences):
+    global _sequences
+    _sequences = sequences
+
+
+def evaluate(first, rows):
+    """
+    Replay every sequence with one BatchGame session per row. Returns
+    (first, hits, false positives, misses, seconds, frames); the counts are
+    (rows, len(GESTURES)) arrays.
+    """
+    n = len(rows)
+    config = GestureConfig(*np.array(rows, dtype=np.float64).T)
+    hits, false, misses = (np.zeros((n, len(GESTURES)), dtype=np.int64) for _ in range(3))
+    frames = 0
+    start = time.perf_counter()
+    for _, ts, lm, width, height, (starts, ends, labeled) in _sequences:
+        game = BatchGame(n, width, height, config=config)
+        valid = ~np.isnan(lm[:, 0, 0])
+        fired_at, fired_by, fired = [], [], []
+        for i, now in enumerate(ts.tolist()):
+            game.advance(now)
+            game.update(now, lm[i], valid[i])
+            gesture = _GESTURE_OF[game.gesture]
+            sessions = np.flatnonzero(gesture >= 0)
+            if len(sessions):
+                fired_at.append(np.full(len(sessions), now))
+                fired_by.append(sessions)
+                fired.append(gesture[sessions])
+        frames += len(ts)
+        if not fired:
+            np.add.at(misses, (slice(None), labeled), 1)
+            continue
+        at, by, gesture = np.concatenate(fired_at), np.concatenate(fired_by), np.concatenate(fired)
+        window = np.searchsorted(starts, at, side="right") - 1
+        inside = window >= 0
+        inside[inside] &= at[inside] <= ends[window[inside]]
+        match = inside & (labeled[np.maximum(window, 0)] == gesture)
+        # only the first firing in a window counts as the hit
+        key = by * len(starts) + window
+        first_hit = np.zeros(len(at), dtype=bool)
+        first_hit[np.flatnonzero(match)[np.unique(key[match], return_index=True)[1]]] = True
+        np.add.at(hits, (by[first_hit], gesture[first_hit]), 1)
+        np.add.at(false, (by[~first_hit], gesture[~first_hit]), 1)
+        found = np.zeros((n, len(starts)), dtype=bool)
+        found[by[first_hit], window[first_hit]] = True
+        np.add.at(misses, (slice(None), labeled), ~found)
+    return first, hits, false, misses, time.perf_counter() - start, frames
+
+
+def sweep(sequences, rows, jobs=None, batch=64, progress=None):
+    """Evaluate all rows, `batch` per task, on `jobs` processes (1: in this process)."""
+    n = len(rows)
+    hits, false, misses = (np.zeros((n, len(GESTURES)), dtype=np.int64) for _ in range(3))
+    fps = np.zeros(n)
+    chunks = [(i, rows[i:i + batch]) for i in range(0, n, batch)]
+
+    def collect(result):
+        first, h, f, m, seconds, frames = result
+        end = first + len(h)
+        hits[first:end], false[first:end], misses[first:end] = h, f, m
+        fps[first:end] = frames * len(h) / seconds  # session-frames per second in this chunk
+        if progress is not None:
+            progress(end - first)
+
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1:
+        _init(sequences)
+        for first, chunk in chunks:
+            collect(evaluate(first, chunk))
+    else:
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(jobs, mp_context=ctx, initializer=_init, initargs=(sequences,)) as pool:
+            for future in as_completed([pool.submit(evaluate, first, chunk) for first, chunk in chunks]):
+                collect(future.result())
+    return hits, false, misses, fps
+
+
+def scores(hits, false, misses):
+    """precision, recall (NaN where undefined) and the mean F1 over the moves that were labeled."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        precision = hits / (hits + false)
+        recall = hits / (hits + misses)
+        f1 = np.nan_to_num(2 * precision * recall / (precision + recall))
+    labeled = (hits + misses).sum(axis=0) > 0
+    return precision, recall, f1[:, labeled].mean(axis=1) if labeled.any() else np.zeros(len(hits))
+
+
+# ---------- Report ----------
+def _pr(p, r):
+    fmt = lambda v: " -- " if np.isnan(v) else f"{v:.2f}"
+    return f"{fmt(p)}/{fmt(r)}"
+
+
+def report(rows, varied, precision, recall, score, fps, top=10):
+    """Lines for the best `top` rows, and config.py's (row 0) below them."""
+    shown = [g for g in range(len(GESTURES)) if not np.isnan(recall[:, g]).all() or not np.isnan(precision[:, g]).all()]
+    columns = [GESTURE_PARAMS.index(name) for name in varied]
+    header = "  rank  score  " + "".join(f"{GESTURE_PARAMS[c]:>{max(len(GESTURE_PARAMS[c]), 8) + 2}}" for c in columns)
+    header += "".join(f"{GESTURES[g]:>{max(len(GESTURES[g]), 9) + 2}}" for g in shown) + "     frames/s"
+    lines = [header]
+    order = np.argsort(-score, kind="stable")
+    rank = {int(i): r + 1 for r, i in enumerate(order)}
+    for i in list(order[:top]) + ([0] if rank[0] > top else []):
+        line = f"  {rank[int(i)]:>4}  {score[i]:.3f}  "
+        line += "".join(f"{rows[i][c]:>{max(len(GESTURE_PARAMS[c]), 8) + 2}.4g}" for c in columns)
+        line += "".join(f"{_pr(precision[i, g], recall[i, g]):>{max(len(GESTURES[g]), 9) + 2}}" for g in shown)
+        line += f"  {fps[i]:>11.0f}" + ("   <- config.py" if i == 0 else "")
+        lines.append(line)
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--param", action="append", type=parse_param, default=[],
+                        help="NAME=v1,v2,... or NAME=lo:hi (repeatable); default: every parameter, +-50%%")
+    parser.add_argument("--samples", type=int, help="random search with this many draws (default 256 with ranges)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--recording", action="append", default=[], help="labeled recording to include (repeatable)")
+    parser.add_argument("--cycles", type=int, default=2, help="synthetic session length, 0 to leave it out")
+    parser.add_argument("--jobs", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--batch", type=int, default=64, help="combinations per task, evaluated as one BatchGame")
+    parser.add_argument("--top", type=int, default=10, help="rows to print")
+    parser.add_argument("--json", help="write every combination's results here")
+    args = parser.parse_args()
+
+    params = dict(args.param)
+    rows = combinations(params, args.samples, args.seed)
+    sequences = load_sequences(args.cycles, args.recording)
+    if not sequences:
+        sys.exit("nothing to evaluate: no synthetic session (--cycles 0) and no --recording")
+    frames = sum(len(s[1]) for s in sequences)
+    print(f"{len(rows)} combinations x {frames} frames ({', '.join(s[0] for s in sequences)})")
+
+    done = [0]
+
+    def progress(n):
+        done[0] += n
+        print(f"\r  {done[0]}/{len(rows)}", end="\n" if done[0] == len(rows) else "", flush=True)
+
+    start = time.perf_counter()
+    hits, false, misses, fps = sweep(sequences, rows, args.jobs, args.batch, progress)
+    elapsed = time.perf_counter() - start
+    print(f"{len(rows)} combinations in {elapsed:.1f}s, {len(rows) * frames / elapsed:.0f} frames/s overall")
+
+    precision, recall, score = scores(hits, false, misses)
+    varied = [name for name in GESTURE_PARAMS if name in params] or list(GESTURE_PARAMS)
+    print("\n".join(report(rows, varied, precision, recall, score, fps, args.top)))
+
+    if args.json:
+        results = [
+            {
+                "params": dict(zip(GESTURE_PARAMS, row)),
+                "score": round(float(score[i]), 4),
+                "frames_per_second": round(float(fps[i]), 1),
+                "gestures": {
+                    name: {"hits": int(hits[i, g]), "false": int(false[i, g]), "misses": int(misses[i, g])}
+                    for g, name in enumerate(GESTURES)
+                },
+            }
+            for i, row in enumerate(rows)
+        ]
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"saved {len(results)} results to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
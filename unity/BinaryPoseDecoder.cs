@@ -0,0 +1,124 @@
+using System;
+using UnityEngine;
+
+// One decoded binary message from the Python server (see protocol.py).
+public struct PoseFrame
+{
+    public int version;
+    public uint seq;             // publish counter; ignore messages that are not newer
+    public uint frameId;
+    public double timestamp;     // capture time, seconds since epoch
+    public double ballTime;      // time the ball position is for
+    public string action;        // same strings as the JSON "action" field
+    public bool? shotIn;         // null = not shooting
+    public Vector4 ball;         // x, y, vx, vy in camera pixels
+    public bool hasPrediction;
+    public Vector2 predicted;    // ball x, y at predictedTime (the expected render time)
+    public double predictedTime;
+    public bool hasPose;
+    public Vector3[] landmarks;  // 33 normalized (x, y, z), only when hasPose
+}
+
+public static class BinaryPoseDecoder
+{
+    public const int Version = 3;
+    public const string Subprotocol = "bball.bin.v3";
+
+    const int HeaderSize = 16;     // <BBBbId
+    const int TimingSize = 12;     // <Id
+    const int BallSize = 16;       // <4f
+    const int PredictedSize = 16;  // <ffd
+    const int PosePoints = 33;
+    const byte FlagPose = 0x01;
+    const byte FlagPredicted = 0x02;
+
+    // Index = action code on the wire. Generated from protocol.ACTIONS by `python protocol.py`.
+    static readonly string[] Actions =
+    {
+        "dribbling",
+        "holding_left",
+        "holding_right",
+        "holding_both",
+        "holding_auto",
+        "dribble",
+        "dribble_(left)",
+        "dribble_(right)",
+        "between_legs",
+        "behind_back",
+        "cross",
+        "real_shot",
+        "fake_shot",
+        "two-hand_dribble",
+    };
+
+    // Joystick input, client -> server (protocol.INPUT): tag, 3 pad bytes, move x/y, offset x/z.
+    public const int InputSize = 20;
+    const byte InputTag = 0x49;
+
+    public static void EncodeInput(Vector4 input, byte[] buffer)
+    {
+        buffer[0] = InputTag;
+        buffer[1] = buffer[2] = buffer[3] = 0;
+        BitConverter.TryWriteBytes(new Span<byte>(buffer, 4, 4), input.x);
+        BitConverter.TryWriteBytes(new Span<byte>(buffer, 8, 4), input.y);
+        BitConverter.TryWriteBytes(new Span<byte>(buffer, 12, 4), input.z);
+        BitConverter.TryWriteBytes(new Span<byte>(buffer, 16, 4), input.w);
+    }
+
+    // JSON messages start with '{'; binary ones start with the version byte.
+    public static bool IsBinary(byte[] bytes) => bytes.Length > 0 && bytes[0] != (byte)'{';
+
+    // Decodes into `frame`, reusing its landmarks array so steady-state decoding does not allocate.
+    public static bool TryDecode(byte[] bytes, ref PoseFrame frame)
+    {
+        if (bytes.Length < HeaderSize + TimingSize + BallSize || bytes[0] != Version || !BitConverter.IsLittleEndian)
+            return false;
+
+        byte flags = bytes[1];
+        byte action = bytes[2];
+        sbyte shot = (sbyte)bytes[3];
+
+        frame.version = bytes[0];
+        frame.frameId = BitConverter.ToUInt32(bytes, 4);
+        frame.timestamp = BitConverter.ToDouble(bytes, 8);
+        frame.action = action < Actions.Length ? Actions[action] : null;
+        frame.shotIn = shot < 0 ? (bool?)null : shot == 1;
+
+        int offset = HeaderSize;
+        frame.seq = BitConverter.ToUInt32(bytes, offset);
+        frame.ballTime = BitConverter.ToDouble(bytes, offset + 4);
+        offset += TimingSize;
+
+        frame.ball = new Vector4(
+            BitConverter.ToSingle(bytes, offset),
+            BitConverter.ToSingle(bytes, offset + 4),
+            BitConverter.ToSingle(bytes, offset + 8),
+            BitConverter.ToSingle(bytes, offset + 12));
+        offset += BallSize;
+
+        frame.hasPrediction = (flags & FlagPredicted) != 0;
+        if (frame.hasPrediction)
+        {
+            if (bytes.Length < offset + PredictedSize) return false;
+            frame.predicted = new Vector2(BitConverter.ToSingle(bytes, offset), BitConverter.ToSingle(bytes, offset + 4));
+            frame.predictedTime = BitConverter.ToDouble(bytes, offset + 8);
+            offset += PredictedSize;
+        }
+
+        frame.hasPose = (flags & FlagPose) != 0;
+        if (frame.hasPose)
+        {
+            if (bytes.Length < offset + PosePoints * 12) return false;
+            if (frame.landmarks == null || frame.landmarks.Length != PosePoints)
+                frame.landmarks = new Vector3[PosePoints];
+            for (int i = 0; i < PosePoints; i++, offset += 12)
+            {
+                frame.landmarks[i] = new Vector3(
+                    BitConverter.ToSingle(bytes, offset),
+                    BitConverter.ToSingle(bytes, offset + 4),
+                    BitConverter.ToSingle(bytes, offset + 8));
+            }
+        }
+        return true;
+    }
+}
@@ -23,6 +23,25 @@ public class UnityReceiver_Native : MonoBehaviour
     [Header("Joystick Settings")]
     public float moveSpeed = 3f;
 
+    [Header("Protocol")]
+    public bool useBinaryProtocol = true;  // falls back to JSON if the server doesn't offer it
+    public bool usePrediction = true;      // follow the server's predicted ball position when it sends one
+
+    [Header("Input Sending")]
+    public float inputSendRate = 30f;   // max input messages per second; the newest input always wins
+    public float inputKeepAlive = 0.5f; // resend unchanged input this often (seconds)
+    public bool logInput = false;       // Debug.Log every input message sent
+
+    [Header("Server Quality (set by the server)")]
+    public int qualityLevel;           // 0 = best; higher levels trade accuracy for frame rate
+    public int inferenceSkip = 1;      // pose runs on every Nth camera frame
+    public float poseUpdateRate;       // pose updates per second the server actually delivers
+    public string serverState = "";    // "warming" while the camera / pose model start, then "live" (or "failed")
+    public float timeToFirstFrame;     // seconds from server start to its first processed frame
+
+    [Header("Trajectories")]
+    public bool useTrajectories = true;  // play free flights from the server's trajectory message locally (the server sends no per-tick snapshots for them)
+
     bool isConnecting = false;
     bool isShooting = false;
     bool ignorePython = false;
@@ -32,6 +51,12 @@ public class UnityReceiver_Native : MonoBehaviour
     Vector3 initialBallPos;
     Vector3 manualOffset = Vector3.zero;  // 🕹️ joystick/keyboard offset
 
+    // current server trajectory: segments [t, x, y, vx, vy, g] in server seconds / pixels
+    double[][] flightSegments;
+    double flightDrag;
+    double serverClockOffset;  // server time - local time, from the message's "now"
+    bool inFlight = false;
+
     void Start()
     {
         lastPosition = Vector3.zero;
@@ -61,18 +86,44 @@ public class UnityReceiver_Native : MonoBehaviour
 
     async void ConnectToPython()
     {
-        ws = new WebSocket("ws://localhost:8765");
+        ws = useBinaryProtocol
+            ? new WebSocket("ws://localhost:8765", BinaryPoseDecoder.Subprotocol)
+            : new WebSocket("ws://localhost:8765");
 
         ws.OnOpen += () =>
         {
             Debug.Log("Connected to Python WebSocket");
             isConnecting = false;
+            lastSeq = 0;  // the server may have restarted
+            serverSpeaksBinary = false;
         };
 
         ws.OnMessage += (bytes) =>
         {
+            if (BinaryPoseDecoder.IsBinary(bytes))
+            {
+                serverSpeaksBinary = true;  // binary protocol negotiated: send input as binary too
+                if (BinaryPoseDecoder.TryDecode(bytes, ref lastFrame))
+                    HandlePoseFrame(lastFrame);
+                return;
+            }
             string message = System.Text.Encoding.UTF8.GetString(bytes);
             JObject data = JObject.Parse(message);
+            if (data["type"]?.ToString() == "quality")
+            {
+                HandleQuality(data);
+                return;
+            }
+            if (data["type"]?.ToString() == "trajectory")
+            {
+                HandleTrajectory(data);
+                return;
+            }
+            if (data["type"]?.ToString() == "status")
+            {
+                HandleStatus(data);
+                return;
+            }
             HandlePoseData(data);
         };
 
@@ -92,12 +143,140 @@ public class UnityReceiver_Native : MonoBehaviour
     }
 
     bool lastShotState = false;
+    PoseFrame lastFrame;
+    uint lastSeq;
+
+    bool serverSpeaksBinary = false;
+    float lastInputSend = float.NegativeInfinity;
+    Vector4 lastInputSent;
+    readonly byte[] inputBuffer = new byte[BinaryPoseDecoder.InputSize];
+
+    // At most inputSendRate messages per second, and unchanged input only as a keep-alive.
+    void SendInput(Vector2 moveInput)
+    {
+        Vector4 input = new Vector4(moveInput.x, moveInput.y, manualOffset.x, manualOffset.z);
+        float now = Time.unscaledTime;
+        if (now - lastInputSend < 1f / inputSendRate) return;
+        if (input == lastInputSent && now - lastInputSend < inputKeepAlive) return;
+        lastInputSend = now;
+        lastInputSent = input;
+
+        if (serverSpeaksBinary)
+        {
+            BinaryPoseDecoder.EncodeInput(input, inputBuffer);
+            ws.Send(inputBuffer);
+        }
+        else
+        {
+            JObject msg = new JObject();
+            msg["type"] = "input";
+            msg["move_x"] = input.x;
+            msg["move_y"] = input.y;
+            msg["offset_x"] = input.z;
+            msg["offset_z"] = input.w;
+            ws.SendText(msg.ToString(Newtonsoft.Json.Formatting.None));
+        }
+        if (logInput)
+            Debug.Log($"[SEND→PYTHON] move=({input.x:F2},{input.y:F2})");
+    }
+
+    // Heartbeats repeat the last snapshot; skip repeats and anything older than what is shown.
+    bool IsNewer(uint seq)
+    {
+        if (seq != 0 && seq <= lastSeq) return false;
+        lastSeq = seq;
+        return true;
+    }
 
     void HandlePoseData(JObject data)
     {
-        if (ball == null) return;
+        if (!IsNewer(data["seq"]?.ToObject<uint>() ?? 0)) return;
 
         bool? shotIn = data["shot_in"]?.Type == JTokenType.Boolean ? (bool?)data["shot_in"] : null;
+
+        float? bx = null, by = null;
+        JObject ballData = data["ball"] as JObject;
+        if (ballData != null)
+        {
+            bx = (float)(ballData["x"]?.ToObject<double>() ?? 320);
+            by = (float)(ballData["y"]?.ToObject<double>() ?? 240);
+        }
+        JObject predicted = data["predicted"] as JObject;
+        if (usePrediction && predicted != null)
+        {
+            bx = (float)predicted["x"].ToObject<double>();
+            by = (float)predicted["y"].ToObject<double>();
+        }
+
+        ApplyState(shotIn, bx, by);
+    }
+
+    void HandleQuality(JObject data)
+    {
+        int level = data["level"]?.ToObject<int>() ?? 0;
+        if (level != qualityLevel)
+            Debug.Log($"Server quality level {level}: complexity {data["model_complexity"]}, " +
+                      $"downscale {data["downscale"]}, skip {data["skip"]}");
+        qualityLevel = level;
+        inferenceSkip = data["skip"]?.ToObject<int>() ?? 1;
+        poseUpdateRate = data["fps"]?.ToObject<float>() ?? 0f;
+    }
+
+    void HandleStatus(JObject data)
+    {
+        string state = data["state"]?.ToString() ?? "";
+        if (state != serverState)
+            Debug.Log(state == "failed" ? $"Server failed to start: {data["error"]}" : $"Server {state}");
+        serverState = state;
+        timeToFirstFrame = data["timings"]?["first_frame"]?.ToObject<float>() ?? 0f;
+    }
+
+    void HandleTrajectory(JObject data)
+    {
+        if (!(data["active"]?.ToObject<bool>() ?? false))
+        {
+            inFlight = false;  // caught, or knocked off course: snapshots take over again
+            return;
+        }
+        JArray segments = (JArray)data["segments"];
+        flightSegments = new double[segments.Count][];
+        for (int i = 0; i < segments.Count; i++)
+            flightSegments[i] = segments[i].ToObject<double[]>();
+        flightDrag = data["drag"]?.ToObject<double>() ?? 0;
+        serverClockOffset = data["now"].ToObject<double>() - LocalTime();
+        inFlight = useTrajectories && flightSegments.Length > 0;
+    }
+
+    static double LocalTime() => System.DateTimeOffset.UtcNow.ToUnixTimeMilliseconds() / 1000.0;
+
+    // Ball pixel position on the current trajectory at server time t (same closed form as trajectory.py)
+    Vector2 EvaluateFlight(double t)
+    {
+        double[] seg = flightSegments[0];
+        foreach (double[] s in flightSegments)
+        {
+            if (s[0] > t) break;
+            seg = s;
+        }
+        double tau = System.Math.Max(t - seg[0], 0);
+        double x = seg[1] + (flightDrag > 0 ? seg[3] * (1 - System.Math.Exp(-flightDrag * tau)) / flightDrag : seg[3] * tau);
+        double y = seg[2] + seg[4] * tau + 0.5 * seg[5] * tau * tau;
+        return new Vector2((float)x, (float)y);
+    }
+
+    void HandlePoseFrame(PoseFrame frame)
+    {
+        if (!IsNewer(frame.seq)) return;
+        if (usePrediction && frame.hasPrediction)
+            ApplyState(frame.shotIn, frame.predicted.x, frame.predicted.y);
+        else
+            ApplyState(frame.shotIn, frame.ball.x, frame.ball.y);
+    }
+
+    void ApplyState(bool? shotIn, float? bx, float? by)
+    {
+        if (ball == null) return;
+
         bool currentShot = shotIn ?? false;
 
         // Color feedback
@@ -113,18 +292,8 @@ public class UnityReceiver_Native : MonoBehaviour
         if (ignorePython) return;
 
         // Update ball position relative to start
-        JObject ballData = data["ball"] as JObject;
-        if (ballData != null)
-        {
-            float bx = (float)(ballData["x"]?.ToObject<double>() ?? 320);
-            float by = (float)(ballData["y"]?.ToObject<double>() ?? 240);
-
-            float normalizedX = (bx - 320f) / 100f;
-            float normalizedY = (by - 240f) / 100f;
-            float fixedY = Mathf.Clamp(2.5f - normalizedY, 0.5f, 5f);
-
-            targetPos = initialBallPos + new Vector3(normalizedX, fixedY - 2.5f, 0);
-        }
+        if (bx.HasValue && by.HasValue && !inFlight)
+            targetPos = PixelToTarget(bx.Value, by.Value);
 
         // Trigger shot only once when shot_in changes from false → true
         if (currentShot && !lastShotState && !isShooting)
@@ -135,6 +304,15 @@ public class UnityReceiver_Native : MonoBehaviour
         lastShotState = currentShot;
     }
 
+    Vector3 PixelToTarget(float bx, float by)
+    {
+        float normalizedX = (bx - 320f) / 100f;
+        float normalizedY = (by - 240f) / 100f;
+        float fixedY = Mathf.Clamp(2.5f - normalizedY, 0.5f, 5f);
+
+        return initialBallPos + new Vector3(normalizedX, fixedY - 2.5f, 0);
+    }
+
     IEnumerator ShootToRim()
     {
         if (ball == null || rimTarget == null) yield break;
@@ -253,6 +431,13 @@ void Update()
     Vector3 delta = new Vector3(moveInput.x, 0, moveInput.y) * moveSpeed * Time.deltaTime;
     manualOffset += delta;
 
+    // 🏀 Free flight: follow the server's trajectory at the current server time
+    if (inFlight)
+    {
+        Vector2 p = EvaluateFlight(LocalTime() + serverClockOffset);
+        targetPos = PixelToTarget(p.x, p.y);
+    }
+
     // 🧠 3️⃣ Combine Python position + manual offset
     if (ball != null && !ignorePython)
     {
@@ -272,19 +457,9 @@ void Update()
         lastPosition = ball.transform.position;
     }
 
-    // 📨 5️⃣ Send movement data to Python
+    // 📨 5️⃣ Send movement data to Python (rate limited, see SendInput)
     if (ws != null && ws.State == WebSocketState.Open)
-    {
-        JObject msg = new JObject();
-        msg["type"] = "input";
-        msg["move_x"] = moveInput.x;
-        msg["move_y"] = moveInput.y;
-        msg["offset_x"] = manualOffset.x;
-        msg["offset_z"] = manualOffset.z;
-
-        ws.SendText(msg.ToString());
-        Debug.Log($"[SEND→PYTHON] move=({moveInput.x:F2},{moveInput.y:F2})");
-    }
+        SendInput(moveInput);
 }
 
     private void OnApplicationQuit() => ws?.Close();
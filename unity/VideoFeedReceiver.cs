@@ -0,0 +1,60 @@
+using UnityEngine;
+using UnityEngine.UI;
+using NativeWebSocket;
+using System.Collections;
+
+// Player camera feed from the Python server's video side-channel (video.py):
+// one JPEG per message on ws://localhost:8765/video, shown on a RawImage
+// (picture-in-picture) or a renderer's material.
+public class VideoFeedReceiver : MonoBehaviour
+{
+    public string url = "ws://localhost:8765/video";
+    public RawImage target;            // UI picture-in-picture
+    public Renderer targetRenderer;    // or a quad / screen in the scene
+
+    WebSocket ws;
+    bool isConnecting = false;
+    Texture2D texture;
+    byte[] pending;  // newest JPEG not decoded yet; older ones are simply replaced
+
+    void Start()
+    {
+        texture = new Texture2D(2, 2, TextureFormat.RGB24, false);  // LoadImage resizes it
+        if (target != null) target.texture = texture;
+        if (targetRenderer != null) targetRenderer.material.mainTexture = texture;
+        StartCoroutine(AutoConnectLoop());
+    }
+
+    IEnumerator AutoConnectLoop()
+    {
+        while (true)
+        {
+            if ((ws == null || ws.State != WebSocketState.Open) && !isConnecting)
+            {
+                isConnecting = true;
+                Connect();
+            }
+            yield return new WaitForSeconds(2f);
+        }
+    }
+
+    async void Connect()
+    {
+        ws = new WebSocket(url);
+        ws.OnOpen += () => { isConnecting = false; };
+        ws.OnMessage += (bytes) => { pending = bytes; };
+        ws.OnError += (e) => { isConnecting = false; };
+        ws.OnClose += (e) => { isConnecting = false; };
+        await ws.Connect();
+    }
+
+    void Update()
+    {
+        ws?.DispatchMessageQueue();
+        if (pending == null) return;
+        texture.LoadImage(pending);  // decode only the newest frame, once per rendered frame at most
+        pending = null;
+    }
+
+    private void OnApplicationQuit() => ws?.Close();
+}
@@ -1,12 +1,10 @@
-import cv2
 import math
 import time
-import json
-import asyncio
-import mediapipe as mp
-import websockets
-import numpy as np
 from config import *
 
+# Only what the game modules need. cv2, mediapipe and the network modules are imported
+# by the modules that use them, so importing the gesture code stays cheap (mediapipe
+# alone takes over a second; pose_worker.py loads it on the model thread at startup).
+
 def dist(a, b):
     return math.hypot(a[0]-b[0], a[1]-b[1])
@@ -0,0 +1,148 @@
+"""
+Compressed video side-channel: the player's (flipped) camera feed as JPEG
+frames on its own websocket path (VIDEO_PATH), for picture-in-picture on
+Unity or venue screens without a second process opening the webcam.
+
+The pipeline only hands over a reference to each frame (offer(), a
+reference swap, and only while someone is watching and a frame is due at
+VIDEO_FPS). A worker thread scales it to VIDEO_WIDTH and encodes it, so
+the pose / gesture loop never waits for the encoder. The preview draws
+its overlay into the same buffer, so it calls release(frame) first: a
+frame the encoder has not picked up yet is scaled right there (once per
+video frame), and one it is reading is waited for. Either way the clients
+see the camera image, not the overlay.
+
+Each client gets the newest JPEG when it is ready for one
+(latest-frame-wins); a slow client skips frames instead of queueing them,
+and never holds up the others. Messages are bare JPEG bytes.
+"""
+import asyncio
+import threading
+import time
+from urllib.parse import urlsplit
+
+import cv2
+import websockets
+
+from config import VIDEO_FPS, VIDEO_PATH, VIDEO_QUALITY, VIDEO_WIDTH
+from telemetry import telemetry
+
+
+class VideoFeed:
+    def __init__(self, width=VIDEO_WIDTH, fps=VIDEO_FPS, quality=VIDEO_QUALITY):
+        self.width = width
+        self.interval = 1.0 / fps
+        self.params = [cv2.IMWRITE_JPEG_QUALITY, quality]
+        self.latest = None  # (seq, jpeg bytes)
+        self.seq = 0
+        self._cond = threading.Condition()
+        self._frame = None  # full-size frame offered, not picked up yet
+        self._small = None  # ... or already scaled by release()
+        self._busy = None   # full-size frame the encoder is reading right now
+        self._due = 0.0     # monotonic time the next frame is wanted
+        self._clients = set()  # one asyncio.Event per connected client
+        self._loop = None
+        self._thread = None
+
+    # ---------- Pipeline side (any thread) ----------
+    def offer(self, frame):
+        """Keep a reference to the newest frame for the encoder; never copies or blocks."""
+        if not self._clients or time.monotonic() < self._due:
+            return
+        self._due = time.monotonic() + self.interval
+        with self._cond:
+            self._frame, self._small = frame, None
+            self._cond.notify()
+
+    def release(self, frame):
+        """Call before writing into `frame`; returns once the encoder no longer needs its pixels."""
+        with self._cond:
+            if self._frame is frame:
+                small = self._scale(frame)
+                self._frame, self._small = None, small if small is not frame else frame.copy()
+                self._cond.notify()
+            while self._busy is frame:
+                self._cond.wait()
+
+    def _scale(self, frame):
+        """The frame at VIDEO_WIDTH (a new buffer), or the frame itself if it is no wider."""
+        h, w = frame.shape[:2]
+        if w <= self.width:
+            return frame
+        return cv2.resize(frame, (self.width, h * self.width // w), interpolation=cv2.INTER_AREA)
+
+    # ---------- Encoder thread ----------
+    def start(self):
+        """Start the encoder; call from inside the running event loop (clients are served there)."""
+        self._loop = asyncio.get_running_loop()
+        self._thread = threading.Thread(target=self._run, name="video", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._frame is None and self._small is None:
+                    self._cond.wait()
+                frame, small = self._frame, self._small
+                self._frame = self._small = None
+                self._busy = frame
+            t0 = time.perf_counter()
+            try:
+                if small is None:
+                    small = self._scale(frame)
+                    if small is not frame:
+                        self._done(frame)  # the pixels we need are in `small` now
+                ok, jpeg = cv2.imencode(".jpg", small, self.params)
+            finally:
+                self._done(frame)
+            telemetry.record("video_encode", time.perf_counter() - t0)
+            if ok:
+                self.seq += 1
+                self.latest = (self.seq, jpeg.tobytes())
+                self._loop.call_soon_threadsafe(self._wake_clients)
+
+    def _done(self, frame):
+        with self._cond:
+            if self._busy is frame:
+                self._busy = None
+                self._cond.notify_all()
+
+    # ---------- Clients (event loop) ----------
+    def _wake_clients(self):
+        for ready in self._clients:
+            ready.set()
+
+    async def serve(self, websocket):
+        """Stream to one client until it disconnects (anything it sends is ignored)."""
+        ready = asyncio.Event()
+        self._clients.add(ready)
+        sender = asyncio.create_task(self._send(websocket, ready))
+        try:
+            await websocket.wait_closed()
+        finally:
+            sender.cancel()
+            self._clients.discard(ready)
+
+    async def _send(self, websocket, ready):
+        """The newest JPEG whenever this client has taken the previous one."""
+        sent = None
+        try:
+            while True:
+                await ready.wait()
+                ready.clear()
+                seq, jpeg = self.latest
+                if seq == sent:
+                    continue
+                if sent is not None and seq > sent + 1:
+                    telemetry.count("video_skipped", seq - sent - 1)  # replaced while this client was busy
+                await websocket.send(jpeg)
+                sent = seq
+        except websockets.ConnectionClosed:
+            pass
+
+
+def is_video_request(websocket):
+    """True for connections to VIDEO_PATH (e.g. ws://localhost:8765/video)."""
+    request = getattr(websocket, "request", None)
+    path = request.path if request is not None else getattr(websocket, "path", "")
+    return urlsplit(path).path == VIDEO_PATH